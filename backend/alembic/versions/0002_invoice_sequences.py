@@ -0,0 +1,20 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002_invoice_sequences'
+down_revision = '0001_init'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'invoice_sequences',
+        sa.Column('business_id', sa.Integer(), sa.ForeignKey('businesses.id'), primary_key=True),
+        sa.Column('last_value', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('invoice_sequences')
@@ -0,0 +1,20 @@
+from alembic import op
+
+from app.search import INDEXES, install_search_index
+
+
+revision = '0003_search_index'
+down_revision = '0002_invoice_sequences'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    install_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    for fts, _ in INDEXES.values():
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS {fts}')
@@ -0,0 +1,57 @@
+from alembic import op
+
+
+revision = '0004_query_indexes'
+down_revision = '0003_search_index'
+branch_labels = None
+depends_on = None
+
+
+# Indexes declared on the models that 0001_init never created.
+COLUMN_INDEXES = [
+    ('ix_users_id', 'users', ['id'], False),
+    ('ix_users_email', 'users', ['email'], True),
+    ('ix_businesses_id', 'businesses', ['id'], False),
+    ('ix_products_id', 'products', ['id'], False),
+    ('ix_products_business_id', 'products', ['business_id'], False),
+    ('ix_customers_id', 'customers', ['id'], False),
+    ('ix_customers_business_id', 'customers', ['business_id'], False),
+    ('ix_invoices_id', 'invoices', ['id'], False),
+    ('ix_invoices_customer_id', 'invoices', ['customer_id'], False),
+    ('ix_invoices_number', 'invoices', ['number'], True),
+    ('ix_invoice_items_id', 'invoice_items', ['id'], False),
+    ('ix_invoice_items_invoice_id', 'invoice_items', ['invoice_id'], False),
+    ('ix_invoice_items_product_id', 'invoice_items', ['product_id'], False),
+]
+
+COMPOSITE_INDEXES = [
+    ('ix_products_business_id_sku', 'products', ['business_id', 'sku']),
+    ('ix_invoices_business_date_id', 'invoices', ['business_id', 'date', 'id']),
+    ('ix_invoices_business_status_date_id', 'invoices', ['business_id', 'status', 'date', 'id']),
+    ('ix_invoices_business_customer_date_id', 'invoices', ['business_id', 'customer_id', 'date', 'id']),
+    ('ix_invoices_business_total', 'invoices', ['business_id', 'total_aed']),
+]
+
+# Single-column indexes older create_all databases have that the composites now cover.
+SUPERSEDED_INDEXES = [
+    ('ix_products_sku', 'products', ['sku']),
+    ('ix_invoices_business_id', 'invoices', ['business_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns, unique in COLUMN_INDEXES:
+        op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+    for name, table, columns in COMPOSITE_INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, table, _ in SUPERSEDED_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, columns in SUPERSEDED_INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+    for name, table, _ in COMPOSITE_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+    for name, table, _, _ in COLUMN_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
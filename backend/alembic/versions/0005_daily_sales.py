@@ -0,0 +1,27 @@
+from alembic import op
+import sqlalchemy as sa
+
+from app.rollups import rebuild_daily_sales
+
+
+revision = '0005_daily_sales'
+down_revision = '0004_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_sales',
+        sa.Column('business_id', sa.Integer(), sa.ForeignKey('businesses.id'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('invoice_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('subtotal_aed', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('vat_aed', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('total_aed', sa.Numeric(14, 2), nullable=False, server_default='0'),
+    )
+    rebuild_daily_sales(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_table('daily_sales')
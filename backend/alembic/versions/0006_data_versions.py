@@ -0,0 +1,21 @@
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0006_data_versions'
+down_revision = '0005_daily_sales'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_versions',
+        sa.Column('business_id', sa.Integer(), sa.ForeignKey('businesses.id'), primary_key=True),
+        sa.Column('resource', sa.String(length=32), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
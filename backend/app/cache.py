@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+from .core.config import settings
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Values are stored as (value, expires_at); expires_at is None when entries never expire.
+        self._data: OrderedDict[Hashable, tuple[Any, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+# (products data version, product) keyed by (business_id, sku) for barcode lookups at the till.
+sku_cache = LRUCache(settings.sku_cache_size)
+
+
+def invalidate_business_skus(business_id: int) -> None:
+    sku_cache.invalidate_where(lambda key, _: key[0] == business_id)
+
+
+def invalidate_skus(business_id: int, skus: Iterable[str | None]) -> None:
+    for sku in skus:
+        sku_cache.invalidate((business_id, sku))
+
+
+# VAT returns for closed periods keyed by (business_id, start, end, invoices data version).
+vat_report_cache = LRUCache(settings.vat_report_cache_size)
+
+
+def invalidate_business_vat(business_id: int) -> None:
+    vat_report_cache.invalidate_where(lambda key, _: key[0] == business_id)
@@ -8,15 +8,59 @@ class Settings(BaseModel):
     secret_key: str = os.getenv("SECRET_KEY", "dev-secret-change-me")
     access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
     algorithm: str = "HS256"
+    auth_cache_ttl_seconds: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+    auth_cache_size: int = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+    password_hash_workers: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    password_hash_max_pending: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
 
     # Database: default to SQLite file in workspace
     database_url: str = os.getenv(
         "DATABASE_URL",
         "sqlite:///./data.db",
     )
+    # Serve the hot endpoints through SQLAlchemy asyncio; the async URLs default
+    # to DATABASE_URL / DATABASE_READ_URL with their async driver (aiosqlite / asyncpg)
+    db_async: bool = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+    async_database_url: str | None = os.getenv("ASYNC_DATABASE_URL")
+    async_database_read_url: str | None = os.getenv("ASYNC_DATABASE_READ_URL")
 
-    # File storage directory
+    # Optional separate database (e.g. a replica) for read-only GET endpoints
+    database_read_url: str | None = os.getenv("DATABASE_READ_URL")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_read_pool_size: int = int(os.getenv("DB_READ_POOL_SIZE", "10"))
+    db_pool_timeout: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+    # SQLite connection profile, applied to every new connection
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+    # Opt-in query profiler for development and staging: groups each request's
+    # statements, flags repeats (N+1) and logs slow queries with their plan
+    query_profiling: bool = os.getenv("QUERY_PROFILING", "false").lower() in ("1", "true", "yes")
+    query_profiling_strict: bool = os.getenv("QUERY_PROFILING_STRICT", "false").lower() in ("1", "true", "yes")
+    query_repeat_threshold: int = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+    slow_query_ms: int = int(os.getenv("SLOW_QUERY_MS", "100"))
+
+    # In-process cache sizes
+    sku_cache_size: int = int(os.getenv("SKU_CACHE_SIZE", "10000"))
+    vat_report_cache_size: int = int(os.getenv("VAT_REPORT_CACHE_SIZE", "1024"))
+
+    # Invoice PDF / receipt rendering: worker processes for bulk exports and the
+    # number of businesses whose decoded images and page templates stay cached
+    render_workers: int = int(os.getenv("RENDER_WORKERS", "2"))
+    render_cache_size: int = int(os.getenv("RENDER_CACHE_SIZE", "64"))
+
+    # Checkouts decrement Product.stock_qty; when set, an invoice that would take
+    # a product below zero is rejected with 409 instead of driving it negative
+    stock_reject_oversell: bool = os.getenv("STOCK_REJECT_OVERSELL", "false").lower() in ("1", "true", "yes")
+
+    # File storage directory; uploads are stored once per content hash
     upload_dir: str = os.getenv("UPLOAD_DIR", "./uploads")
+    upload_max_bytes: int = int(os.getenv("UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
 
 
 settings = Settings()
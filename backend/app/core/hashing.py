@@ -0,0 +1,89 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from passlib.context import CryptContext
+
+from .config import settings
+
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashingPool:
+    # bcrypt is CPU-bound and holds the GIL, so it runs in worker processes
+    # rather than in Starlette's threadpool. Submissions beyond max_pending
+    # are rejected immediately instead of queueing behind a login storm.
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated()
+            self.pending += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _release(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        executor = self._acquire()
+        try:
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory); the next job starts a fresh pool.
+            self._discard(executor)
+            raise
+        finally:
+            self._release()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "rejected": self.rejected,
+            }
+
+
+hashing_pool = HashingPool(settings.password_hash_workers, settings.password_hash_max_pending)
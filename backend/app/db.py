@@ -1,18 +1,156 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .core.config import settings
+from .metrics import instrument_engine
+from .profiling import install_profiler
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-)
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.split("://", 1)[1] in ("", "/"))
+
+
+def _pool_args(url: str, pool_size: int) -> dict:
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "pool_size": pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+
+def _apply_sqlite_profile(engine: Engine, read_only: bool = False) -> None:
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed while a checkout transaction holds the write lock.
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        cursor.execute(f"PRAGMA cache_size=-{settings.sqlite_cache_size_kib}")
+        cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def create_db_engine(url: str, pool_size: int, read_only: bool = False) -> Engine:
+    if not url.startswith("sqlite"):
+        return create_engine(url, pool_pre_ping=True, **_pool_args(url, pool_size))
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+        **_pool_args(url, pool_size),
+    )
+    _apply_sqlite_profile(engine, read_only)
+    return engine
+
+
+def async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    if "+" in scheme:
+        return url
+    driver = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}.get(scheme)
+    return f"{scheme}+{driver}://{rest}" if driver else url
+
+
+def create_async_db_engine(url: str, pool_size: int, read_only: bool = False) -> AsyncEngine:
+    if not url.startswith("sqlite"):
+        return create_async_engine(url, pool_pre_ping=True, **_pool_args(url, pool_size))
+
+    pool_args = _pool_args(url, pool_size)
+    if pool_args:
+        pool_args["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(
+        url, connect_args={"timeout": settings.sqlite_busy_timeout_ms / 1000}, **pool_args
+    )
+    _apply_sqlite_profile(engine.sync_engine, read_only)
+    return engine
+
+
+engine = create_db_engine(settings.database_url, settings.db_pool_size)
+
+# GET endpoints read through their own pool so listings and reports do not
+# queue behind checkout writes for a connection.
+if _is_memory_sqlite(settings.database_url) and not settings.database_read_url:
+    read_engine = engine
+else:
+    read_engine = create_db_engine(
+        settings.database_read_url or settings.database_url, settings.db_read_pool_size, read_only=True
+    )
+
+instrument_engine(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "read")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine: AsyncEngine | None = None
+async_read_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker | None = None
+AsyncReadSessionLocal: async_sessionmaker | None = None
+if settings.db_async:
+    async_engine = create_async_db_engine(
+        settings.async_database_url or async_url(settings.database_url), settings.db_pool_size
+    )
+    # The async GET endpoints get the same separate query_only pool as the sync ones.
+    if read_engine is engine and not settings.async_database_read_url:
+        async_read_engine = async_engine
+    else:
+        async_read_engine = create_async_db_engine(
+            settings.async_database_read_url or async_url(settings.database_read_url or settings.database_url),
+            settings.db_read_pool_size,
+            read_only=True,
+        )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False)
+    instrument_engine(async_engine.sync_engine, "async")
+    if async_read_engine is not async_engine:
+        instrument_engine(async_read_engine.sync_engine, "async_read")
+
+
+def async_engines() -> dict[str, AsyncEngine]:
+    named = {}
+    if async_engine is not None:
+        named["async"] = async_engine
+    if async_read_engine is not None and async_read_engine is not async_engine:
+        named["async_read"] = async_read_engine
+    return named
+
+
+def engines() -> dict[str, Engine]:
+    named = {"primary": engine}
+    if read_engine is not engine:
+        named["read"] = read_engine
+    named.update((name, async_db.sync_engine) for name, async_db in async_engines().items())
+    return named
+
+
+if settings.query_profiling:
+    for name, profiled_engine in engines().items():
+        install_profiler(profiled_engine, name)
+
+
+def pool_stats(engine: Engine) -> dict | None:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.db_max_overflow,
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin(),
+    }
 
 
 def get_db():
@@ -22,3 +160,20 @@ def get_db():
     finally:
         db.close()
 
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
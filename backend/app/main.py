@@ -1,12 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import auth, businesses, products, customers, invoices, uploads, export
-from .db import Base, engine
+from .routers import (
+    auth,
+    businesses,
+    products,
+    customers,
+    invoices,
+    uploads,
+    export,
+    imports,
+    reports,
+    documents,
+    monitoring,
+)
+from .core.config import settings
+from .core.hashing import hashing_pool
+from .db import Base, async_engines, engine
+from .metrics import MetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .rendering import shutdown_render_pool
+from .search import install_search_index
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    hashing_pool.shutdown()
+    shutdown_render_pool()
+    for async_db in async_engines().values():
+        await async_db.dispose()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="UAE Multi-Business POS & Invoice API", version="0.1.0")
+    app = FastAPI(title="UAE Multi-Business POS & Invoice API", version="0.1.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -14,7 +43,17 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Query-Count", "Server-Timing"],
     )
+    if settings.query_profiling:
+        app.add_middleware(ProfilingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    if settings.db_async:
+        # Registered first so they take precedence over the sync routes on the same paths.
+        app.include_router(products.async_router, prefix="/api/products", tags=["products"])
+        app.include_router(customers.async_router, prefix="/api/customers", tags=["customers"])
+        app.include_router(invoices.async_router, prefix="/api/invoices", tags=["invoices"])
 
     app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
     app.include_router(businesses.router, prefix="/api/businesses", tags=["businesses"])
@@ -23,6 +62,10 @@ def create_app() -> FastAPI:
     app.include_router(invoices.router, prefix="/api/invoices", tags=["invoices"])
     app.include_router(uploads.router, prefix="/api/uploads", tags=["uploads"])
     app.include_router(export.router, prefix="/api/export", tags=["export"])
+    app.include_router(imports.router, prefix="/api/import", tags=["import"])
+    app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+    app.include_router(documents.router, prefix="/api/documents", tags=["documents"])
+    app.include_router(monitoring.router, tags=["monitoring"])
 
     @app.get("/health")
     async def health() -> dict:
@@ -32,5 +75,7 @@ def create_app() -> FastAPI:
 
 
 Base.metadata.create_all(bind=engine)
+with engine.begin() as conn:
+    install_search_index(conn)
 app = create_app()
 
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import Engine, event
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.labels = name, help, labels
+        self._values: dict[tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        # Per label set: [count per bucket..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        with self._lock:
+            slots = self._values.setdefault(labels, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    slots[i] += 1
+                    break
+            else:
+                slots[len(self.buckets)] += 1
+            slots[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            for labels, slots in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), slots):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+                yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(slots[-1])}"
+                yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+def gauge(
+    name: str, help: str, labels: tuple[str, ...], samples: dict[tuple, float], kind: str = "gauge"
+) -> Iterable[str]:
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {kind}"
+    for values, value in samples.items():
+        yield f"{name}{_labels(labels, values)} {_number(value)}"
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status")
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements issued per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+requests_in_flight = Gauge("http_requests_in_flight", "Requests currently being served")
+query_seconds = Histogram("db_query_duration_seconds", "SQL statement latency by engine", ("engine",))
+query_errors = Counter("db_query_errors_total", "SQL statements that raised", ("engine",))
+
+# Extra metric families rendered at scrape time, e.g. pool and cache gauges.
+collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in (request_seconds, request_queries, requests_in_flight, query_seconds, query_errors):
+        lines.extend(metric.render())
+    for collect in collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set per request by MetricsMiddleware. Threadpool endpoints and run_sync run in
+# a copy of the request context, which still points at the same RequestStats.
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("query_started_at", time.perf_counter())
+        query_seconds.observe((name,), elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_query(context) -> None:
+        if context.connection is not None:
+            context.connection.info.pop("query_started_at", None)
+        query_errors.inc((name,))
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", app;dur={elapsed_ms:.2f}'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.queries).encode()))
+                headers.append((b"server-timing", timing.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            requests_in_flight.inc(amount=-1)
+            current_request.reset(token)
+            # Label by route template rather than raw path to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_seconds.observe((scope["method"], route, str(status_code)), time.perf_counter() - started)
+            request_queries.observe((scope["method"], route), stats.queries)
@@ -1,5 +1,6 @@
+import datetime as dt
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Date, Boolean
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Numeric, Text, Date, Boolean, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .db import Base
 
@@ -29,10 +30,11 @@ class Business(Base):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (Index("ix_products_business_id_sku", "business_id", "sku"),)
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"), index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    sku: Mapped[str | None] = mapped_column(String(128), index=True)
+    sku: Mapped[str | None] = mapped_column(String(128))
     price_aed: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     stock_qty: Mapped[int] = mapped_column(Integer, default=0)
 
@@ -48,12 +50,20 @@ class Customer(Base):
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    # Composite indexes follow the list_invoices filters, each ending in the
+    # (date, id) listing order so a filtered page is a single index range.
+    __table_args__ = (
+        Index("ix_invoices_business_date_id", "business_id", "date", "id"),
+        Index("ix_invoices_business_status_date_id", "business_id", "status", "date", "id"),
+        Index("ix_invoices_business_customer_date_id", "business_id", "customer_id", "date", "id"),
+        Index("ix_invoices_business_total", "business_id", "total_aed"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"), index=True)
+    business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"))
     customer_id: Mapped[int | None] = mapped_column(ForeignKey("customers.id"), index=True)
     number: Mapped[str] = mapped_column(String(64), unique=True, index=True)
     date: Mapped[date] = mapped_column(Date, default=date.today)
-    due_date: Mapped[date | None] = mapped_column(Date)
+    due_date: Mapped[dt.date | None] = mapped_column(Date)
     notes: Mapped[str | None] = mapped_column(Text)
     subtotal_aed: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
     vat_aed: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
@@ -61,6 +71,33 @@ class Invoice(Base):
     status: Mapped[str] = mapped_column(String(32), default="unpaid")  # unpaid, paid, overdue, draft
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    items: Mapped[list["InvoiceItem"]] = relationship(
+        back_populates="invoice", order_by="InvoiceItem.id", cascade="all, delete-orphan"
+    )
+
+
+class InvoiceSequence(Base):
+    __tablename__ = "invoice_sequences"
+    business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"), primary_key=True)
+    last_value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailySales(Base):
+    __tablename__ = "daily_sales"
+    business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"), primary_key=True)
+    day: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    invoice_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    subtotal_aed: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    vat_aed: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    total_aed: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    business_id: Mapped[int] = mapped_column(ForeignKey("businesses.id"), primary_key=True)
+    resource: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
 
 class InvoiceItem(Base):
     __tablename__ = "invoice_items"
@@ -72,3 +109,4 @@ class InvoiceItem(Base):
     unit_price_aed: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
     line_total_aed: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
 
+    invoice: Mapped[Invoice] = relationship(back_populates="items")
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable
+
+
+# Amounts are handled as integer fils (1 AED = 100 fils). Only the rounding of
+# prices to whole fils and of VAT to the nearest fils (half up) is ever inexact.
+FILS_PER_AED = 100
+VAT_RATE = Decimal("0.05")
+BASIS_POINTS = 10_000
+VAT_BASIS_POINTS = int(VAT_RATE * BASIS_POINTS)
+
+_FILS = Decimal(1)
+
+
+def to_fils(amount: Decimal | float | int | str) -> int:
+    if isinstance(amount, int):
+        return amount * FILS_PER_AED
+    # str() of a float is its shortest repr, so 10.1 becomes Decimal("10.1") and not 10.0999...
+    value = amount if isinstance(amount, Decimal) else Decimal(str(amount))
+    return int(value.scaleb(2).quantize(_FILS, rounding=ROUND_HALF_UP))
+
+
+def to_aed(fils: int) -> Decimal:
+    return Decimal(fils).scaleb(-2)
+
+
+def divide_half_up(numerator: int, denominator: int) -> int:
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def vat_fils(subtotal: int, basis_points: int = VAT_BASIS_POINTS) -> int:
+    return divide_half_up(subtotal * basis_points, BASIS_POINTS)
+
+
+@dataclass(frozen=True)
+class InvoiceTotals:
+    lines: tuple[int, ...]
+    subtotal: int
+    vat: int
+    total: int
+
+    def aed(self) -> tuple[Decimal, Decimal, Decimal]:
+        return to_aed(self.subtotal), to_aed(self.vat), to_aed(self.total)
+
+    def line_aed(self, index: int) -> Decimal:
+        return to_aed(self.lines[index])
+
+
+def invoice_totals(
+    lines: Iterable[tuple[Decimal | float | str, int]], basis_points: int = VAT_BASIS_POINTS
+) -> InvoiceTotals:
+    # VAT is charged once on the invoice subtotal, not per line.
+    line_totals = tuple(to_fils(unit_price) * quantity for unit_price, quantity in lines)
+    subtotal = sum(line_totals)
+    vat = vat_fils(subtotal, basis_points)
+    return InvoiceTotals(line_totals, subtotal, vat, subtotal + vat)
@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return [convert(v) for convert, v in zip(types, values)]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def make_page(rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> dict:
+    # Callers fetch limit + 1 rows; the extra row only signals that another page exists.
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
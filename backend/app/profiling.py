@@ -0,0 +1,170 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from sqlalchemy import Engine, event
+
+from .core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_VALUES_ROWS = re.compile(r"(\(\.\.\.\)|\(\s*\?[^()]*\))(?:\s*,\s*(?:\(\.\.\.\)|\(\s*\?[^()]*\)))+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    # Literals and the length of IN / multi-row VALUES lists vary per call,
+    # so they are folded away to group statements that only differ in data.
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("(...)", statement)
+    statement = _VALUES_ROWS.sub(r"\1", statement)
+    return _SPACE.sub(" ", statement).strip()
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+@dataclass
+class QueryProfile:
+    label: str = ""
+    statements: Counter = field(default_factory=Counter)
+    db_seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(self.statements.values())
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(sql, n) for sql, n in self.statements.most_common() if n > threshold]
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar("current_profile", default=None)
+
+# Callbacks fed every finished request profile; query_budget uses them to see
+# requests that TestClient runs on its own event loop thread.
+_observers: list[Callable[[QueryProfile], None]] = []
+_observers_lock = threading.Lock()
+
+
+def explain(cursor, statement: str, parameters, dialect: str) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    try:
+        plan = cursor.connection.cursor()
+        try:
+            plan.execute(prefix + statement, parameters)
+            return "\n".join(" ".join(str(col) for col in row) for row in plan.fetchall())
+        finally:
+            plan.close()
+    except Exception as e:  # the plan is diagnostic only; never fail the real query over it
+        return f"unavailable ({e.__class__.__name__})"
+
+
+def install_profiler(engine: Engine, name: str) -> None:
+    slow_seconds = settings.slow_query_ms / 1000
+    threshold = settings.query_repeat_threshold
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["profile_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info.pop("profile_started_at", time.perf_counter())
+        profile = current_profile.get()
+        if profile is not None:
+            key = normalize(statement)
+            profile.statements[key] += 1
+            profile.db_seconds += elapsed
+            if settings.query_profiling_strict and profile.statements[key] > threshold:
+                raise QueryBudgetExceeded(f"{profile.statements[key]} executions of: {key}")
+
+        if elapsed >= slow_seconds:
+            is_select = statement.lstrip().upper().startswith(("SELECT", "WITH"))
+            plan = "-"
+            if is_select and not executemany:
+                plan = explain(cursor, statement, parameters, engine.dialect.name)
+            logger.warning(
+                "Slow query on %s engine (%.1f ms)%s\n%s\nparameters: %r\nplan:\n%s",
+                name,
+                elapsed * 1000,
+                f" in {profile.label}" if profile is not None and profile.label else "",
+                statement,
+                parameters,
+                plan,
+            )
+
+
+def report(profile: QueryProfile) -> None:
+    for statement, count in profile.repeated(settings.query_repeat_threshold):
+        logger.warning("Possible N+1 in %s: %d executions of %s", profile.label, count, statement)
+    with _observers_lock:
+        observers = list(_observers)
+    for observe in observers:
+        observe(profile)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_profile.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            profile.label = f"{scope['method']} {route}"
+            report(profile)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_repeats: int | None = None) -> Iterator[list[QueryProfile]]:
+    # Checks the block itself and every request served while it is open, e.g.
+    #     with query_budget(3, max_repeats=1):
+    #         client.get("/api/invoices/", params={"business_id": 1})
+    if not settings.query_profiling:
+        raise RuntimeError("query_budget needs QUERY_PROFILING=1 so statements are recorded")
+
+    local = QueryProfile(label="query_budget block")
+    profiles = [local]
+
+    def observe(profile: QueryProfile) -> None:
+        profiles.append(profile)
+
+    token = current_profile.set(local)
+    with _observers_lock:
+        _observers.append(observe)
+    try:
+        yield profiles
+    finally:
+        with _observers_lock:
+            _observers.remove(observe)
+        current_profile.reset(token)
+
+    failures = []
+    for profile in profiles:
+        if profile.total > max_queries:
+            failures.append(f"{profile.label}: {profile.total} queries (budget {max_queries})")
+        for statement, count in profile.repeated(max_repeats) if max_repeats is not None else []:
+            failures.append(f"{profile.label}: {count} executions of {statement}")
+    if failures:
+        raise QueryBudgetExceeded("\n".join(failures))
@@ -0,0 +1,123 @@
+import argparse
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, ColumnElement, case, cast, exists, func, literal_column, or_, select, true, union, update
+from sqlalchemy.orm import Session
+
+from .cache import invalidate_business_vat
+from .models import Invoice, InvoiceItem
+from .money import BASIS_POINTS, VAT_BASIS_POINTS, VAT_RATE
+from .rollups import rebuild_daily_sales
+from .versions import bump_businesses
+
+
+@dataclass
+class RecomputeReport:
+    items: int = 0
+    invoices: int = 0
+    business_ids: list[int] = field(default_factory=list)
+
+
+def fils(amount) -> ColumnElement:
+    # SQLite stores Numeric as REAL; ROUND() absorbs the binary error before the cast.
+    return cast(func.round(amount * 100), BigInteger)
+
+
+def aed(fils_amount) -> ColumnElement:
+    return fils_amount / literal_column("100.0")
+
+
+def divide_half_up(numerator, denominator: int) -> ColumnElement:
+    # money.divide_half_up in SQL: integer division truncates toward zero, so
+    # round the magnitude and put the sign back for return lines.
+    magnitude = (func.abs(numerator) + denominator // 2) // denominator
+    return case((numerator < 0, -magnitude), else_=magnitude)
+
+
+def recompute_totals(
+    db: Session, business_id: int | None = None, basis_points: int = VAT_BASIS_POINTS, dry_run: bool = False
+) -> RecomputeReport:
+    # Set-based version of money.invoice_totals: a handful of statements over
+    # the whole table instead of loading every invoice, so the database does
+    # the integer fils arithmetic and only rows that drifted are rewritten.
+    in_scope = Invoice.business_id == business_id if business_id is not None else true()
+    scoped_ids = select(Invoice.id).where(in_scope)
+
+    line_fils = fils(InvoiceItem.unit_price_aed) * InvoiceItem.quantity
+    item_drift = fils(InvoiceItem.line_total_aed) != line_fils
+    item_scope = InvoiceItem.invoice_id.in_(scoped_ids) if business_id is not None else true()
+
+    sums = (
+        select(InvoiceItem.invoice_id, cast(func.sum(line_fils), BigInteger).label("subtotal"))
+        .where(item_scope)
+        .group_by(InvoiceItem.invoice_id)
+        .subquery()
+    )
+    vat = divide_half_up(sums.c.subtotal * basis_points, BASIS_POINTS)
+    invoice_drift = or_(
+        fils(Invoice.subtotal_aed) != sums.c.subtotal,
+        fils(Invoice.vat_aed) != vat,
+        fils(Invoice.total_aed) != sums.c.subtotal + vat,
+    )
+    # Invoices without lines have nothing to sum and are owed zero totals.
+    empty = ~exists().where(InvoiceItem.invoice_id == Invoice.id)
+    empty_drift = or_(Invoice.subtotal_aed != 0, Invoice.vat_aed != 0, Invoice.total_aed != 0)
+
+    affected = union(
+        select(Invoice.business_id).join(sums, sums.c.invoice_id == Invoice.id).where(invoice_drift),
+        select(Invoice.business_id).where(in_scope, empty, empty_drift),
+        select(Invoice.business_id).join(InvoiceItem).where(item_scope, item_drift),
+    )
+    report = RecomputeReport(business_ids=sorted(db.scalars(affected)))
+    if dry_run:
+        report.items = db.scalar(select(func.count()).select_from(InvoiceItem).where(item_scope, item_drift))
+        report.invoices = db.scalar(
+            select(func.count()).select_from(Invoice).join(sums, sums.c.invoice_id == Invoice.id).where(invoice_drift)
+        ) + db.scalar(select(func.count()).select_from(Invoice).where(in_scope, empty, empty_drift))
+        return report
+
+    report.items = db.execute(
+        update(InvoiceItem).where(item_scope, item_drift).values(line_total_aed=aed(line_fils))
+    ).rowcount
+    report.invoices = db.execute(
+        update(Invoice)
+        .where(Invoice.id == sums.c.invoice_id, invoice_drift)
+        .values(subtotal_aed=aed(sums.c.subtotal), vat_aed=aed(vat), total_aed=aed(sums.c.subtotal + vat))
+    ).rowcount
+    report.invoices += db.execute(
+        update(Invoice).where(in_scope, empty, empty_drift).values(subtotal_aed=0, vat_aed=0, total_aed=0)
+    ).rowcount
+
+    if report.business_ids:
+        rebuild_daily_sales(db, business_id)
+        bump_businesses(db, report.business_ids, "invoices")
+    db.commit()
+    for affected_id in report.business_ids:
+        invalidate_business_vat(affected_id)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.recompute",
+        description="Recompute invoice line, VAT and total amounts in integer fils and rebuild the sales rollup",
+    )
+    parser.add_argument("--business-id", type=int, help="limit to one business")
+    parser.add_argument("--vat-rate", type=Decimal, default=VAT_RATE, help=f"VAT rate to apply (default {VAT_RATE})")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows that would change")
+    args = parser.parse_args()
+
+    from .db import SessionLocal
+
+    with SessionLocal() as db:
+        report = recompute_totals(db, args.business_id, int(args.vat_rate * BASIS_POINTS), args.dry_run)
+    verb = "would change" if args.dry_run else "changed"
+    print(
+        f"{verb} {report.invoices} invoice(s) and {report.items} line(s) "
+        f"across {len(report.business_ids)} business(es)"
+    )
+
+
+if __name__ == "__main__":
+    main()
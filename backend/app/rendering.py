@@ -0,0 +1,388 @@
+import io
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Iterable
+
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from .cache import LRUCache
+from .core.config import settings
+from .money import VAT_RATE
+from .storage import preferred_image
+
+
+DPI = 150
+PAGE_SIZE = (1240, 1754)  # A4 at 150 dpi
+MARGIN = 90
+TABLE_TOP = 640
+ROW_HEIGHT = 44
+FOOTER_HEIGHT = 360
+ROWS_PER_PAGE = (PAGE_SIZE[1] - MARGIN - TABLE_TOP - ROW_HEIGHT) // ROW_HEIGHT
+ROWS_ON_LAST_PAGE = ROWS_PER_PAGE - FOOTER_HEIGHT // ROW_HEIGHT
+# Column right edges (x) for the items table; description is left-aligned at MARGIN.
+COLUMNS = {"qty": 760, "unit": 960, "total": PAGE_SIZE[0] - MARGIN}
+
+RECEIPT_WIDTH = 576  # 80 mm thermal roll at 203 dpi
+RECEIPT_MARGIN = 16
+RECEIPT_LINE = 28
+
+RENDER_CHUNK = 25
+
+_UNSAFE_FILENAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass(frozen=True)
+class BusinessDoc:
+    id: int
+    name: str
+    address_line1: str | None = None
+    address_line2: str | None = None
+    contact_number1: str | None = None
+    contact_number2: str | None = None
+    trn: str | None = None
+    logo_path: str | None = None
+    signature_path: str | None = None
+
+
+@dataclass(frozen=True)
+class LineDoc:
+    description: str
+    quantity: int
+    unit_price_aed: float
+    line_total_aed: float
+
+
+@dataclass(frozen=True)
+class InvoiceDoc:
+    number: str
+    date: date
+    due_date: date | None
+    status: str
+    customer_name: str | None
+    customer_trn: str | None
+    notes: str | None
+    subtotal_aed: float
+    vat_aed: float
+    total_aed: float
+    items: tuple[LineDoc, ...]
+
+
+@dataclass
+class Assets:
+    page: Image.Image
+    receipt_header: Image.Image
+    signature: Image.Image | None
+
+
+@lru_cache(maxsize=None)
+def font(size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.load_default(size=size)
+
+
+def money(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+@lru_cache(maxsize=4096)
+def fit(text: str, size: int, width: int) -> str:
+    # Product descriptions repeat across invoices, hence the cache; the longest
+    # prefix that fits is found by bisection rather than trimming a character at a time.
+    measure = font(size).getlength
+    if measure(text) <= width:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if measure(text[:mid] + "…") <= width:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + "…"
+
+
+def _mtime(path: str | None) -> float | None:
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def load_image(path: str | None, box: tuple[int, int]) -> Image.Image | None:
+    if not path:
+        return None
+    try:
+        with Image.open(path) as source:
+            image = ImageOps.exif_transpose(source).convert("RGBA")
+    except (OSError, ValueError):
+        return None
+    image.thumbnail(box, Image.LANCZOS)
+    # Flatten onto white once here so every page paste is a plain RGB copy.
+    flat = Image.new("RGB", image.size, "white")
+    flat.paste(image, mask=image.getchannel("A"))
+    return flat
+
+
+def draw_page_template(business: BusinessDoc, logo: Image.Image | None) -> Image.Image:
+    page = Image.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(page)
+    x, right = MARGIN, PAGE_SIZE[0] - MARGIN
+    if logo is not None:
+        page.paste(logo, (x, MARGIN))
+        x += logo.width + 30
+
+    y = MARGIN
+    draw.text((x, y), fit(business.name, 40, right - x - 360), font=font(40), fill="black")
+    y += 56
+    contacts = " / ".join(c for c in (business.contact_number1, business.contact_number2) if c)
+    for line in (business.address_line1, business.address_line2, contacts, business.trn and f"TRN: {business.trn}"):
+        if line:
+            draw.text((x, y), fit(line, 22, right - x - 360), font=font(22), fill="#333333")
+            y += 30
+    draw.text((right, MARGIN), "TAX INVOICE", font=font(48), fill="black", anchor="ra")
+    draw.line((MARGIN, 300, right, 300), fill="#999999", width=2)
+
+    header_y = TABLE_TOP
+    draw.rectangle((MARGIN, header_y, right, header_y + ROW_HEIGHT), fill="#eeeeee")
+    text_y = header_y + ROW_HEIGHT // 2
+    draw.text((MARGIN + 10, text_y), "Description", font=font(22), fill="black", anchor="lm")
+    draw.text((COLUMNS["qty"], text_y), "Qty", font=font(22), fill="black", anchor="rm")
+    draw.text((COLUMNS["unit"], text_y), "Unit (AED)", font=font(22), fill="black", anchor="rm")
+    draw.text((COLUMNS["total"] - 10, text_y), "Total (AED)", font=font(22), fill="black", anchor="rm")
+    return page
+
+
+def draw_receipt_header(business: BusinessDoc) -> Image.Image:
+    logo = load_image(business.logo_path, (RECEIPT_WIDTH // 2, 120))
+    lines = [(business.name, 30)]
+    lines += [(line, 20) for line in (business.address_line1, business.contact_number1) if line]
+    if business.trn:
+        lines.append((f"TRN: {business.trn}", 20))
+    height = RECEIPT_MARGIN + (logo.height + 10 if logo else 0) + sum(size + 10 for _, size in lines) + 20
+    header = Image.new("L", (RECEIPT_WIDTH, height), 255)
+    draw = ImageDraw.Draw(header)
+    y = RECEIPT_MARGIN
+    if logo is not None:
+        header.paste(logo.convert("L"), ((RECEIPT_WIDTH - logo.width) // 2, y))
+        y += logo.height + 10
+    for text, size in lines:
+        text = fit(text, size, RECEIPT_WIDTH - 2 * RECEIPT_MARGIN)
+        draw.text((RECEIPT_WIDTH // 2, y), text, font=font(size), anchor="ma")
+        y += size + 10
+    draw.line((RECEIPT_MARGIN, height - 10, RECEIPT_WIDTH - RECEIPT_MARGIN, height - 10), fill=0, width=2)
+    return header
+
+
+# Decoded, resized images and pre-drawn page chrome per business. The key holds
+# every business field plus the image mtimes, so edits and re-uploads miss.
+# Images are read from the pre-scaled upload variant once it exists.
+asset_cache = LRUCache(settings.render_cache_size)
+
+
+def business_assets(business: BusinessDoc) -> Assets:
+    business = replace(
+        business,
+        logo_path=preferred_image(business.logo_path),
+        signature_path=preferred_image(business.signature_path),
+    )
+    key = (business, _mtime(business.logo_path), _mtime(business.signature_path))
+    assets = asset_cache.get(key)
+    if assets is None:
+        assets = Assets(
+            page=draw_page_template(business, load_image(business.logo_path, (360, 180))),
+            receipt_header=draw_receipt_header(business),
+            signature=load_image(business.signature_path, (320, 140)),
+        )
+        asset_cache.invalidate_where(lambda k, _: k[0].id == business.id)
+        asset_cache.set(key, assets)
+    return assets
+
+
+def draw_invoice_meta(draw: ImageDraw.ImageDraw, invoice: InvoiceDoc, page: int, pages: int) -> None:
+    right = PAGE_SIZE[0] - MARGIN
+    y = 330
+    draw.text((MARGIN, y), "Bill to", font=font(22), fill="#555555")
+    customer = fit(invoice.customer_name or "Walk-in customer", 28, 560)
+    draw.text((MARGIN, y + 32), customer, font=font(28), fill="black")
+    if invoice.customer_trn:
+        draw.text((MARGIN, y + 72), f"TRN: {invoice.customer_trn}", font=font(22), fill="#333333")
+
+    details = [("Invoice no.", invoice.number), ("Date", invoice.date.isoformat())]
+    if invoice.due_date:
+        details.append(("Due", invoice.due_date.isoformat()))
+    details += [("Status", invoice.status), ("Page", f"{page} of {pages}")]
+    for label, value in details:
+        draw.text((right - 300, y), label, font=font(22), fill="#555555", anchor="ra")
+        draw.text((right, y), value, font=font(22), fill="black", anchor="ra")
+        y += 34
+
+
+def paginate(items: tuple[LineDoc, ...]) -> list[tuple[LineDoc, ...]]:
+    pages = []
+    rest = items
+    while len(rest) > ROWS_ON_LAST_PAGE:
+        pages.append(rest[:ROWS_PER_PAGE])
+        rest = rest[ROWS_PER_PAGE:]
+    # Totals and signature sit under the table on the last page.
+    pages.append(rest)
+    return pages
+
+
+def render_pages(business: BusinessDoc, invoice: InvoiceDoc) -> list[Image.Image]:
+    assets = business_assets(business)
+    chunks = paginate(invoice.items)
+    right = PAGE_SIZE[0] - MARGIN
+    pages = []
+    for number, rows in enumerate(chunks, start=1):
+        page = assets.page.copy()
+        draw = ImageDraw.Draw(page)
+        draw_invoice_meta(draw, invoice, number, len(chunks))
+        y = TABLE_TOP + ROW_HEIGHT
+        for item in rows:
+            text_y = y + ROW_HEIGHT // 2
+            description = fit(item.description, 22, COLUMNS["qty"] - MARGIN - 120)
+            draw.text((MARGIN + 10, text_y), description, font=font(22), fill="black", anchor="lm")
+            for column, value in (
+                ("qty", str(item.quantity)),
+                ("unit", money(item.unit_price_aed)),
+                ("total", money(item.line_total_aed)),
+            ):
+                x = COLUMNS[column] - (10 if column == "total" else 0)
+                draw.text((x, text_y), value, font=font(22), fill="black", anchor="rm")
+            y += ROW_HEIGHT
+            draw.line((MARGIN, y, right, y), fill="#dddddd", width=1)
+
+        if number == len(chunks):
+            y += 30
+            for label, value, size in (
+                ("Subtotal", invoice.subtotal_aed, 24),
+                (f"VAT {VAT_RATE:.0%}", invoice.vat_aed, 24),
+                ("Total (AED)", invoice.total_aed, 30),
+            ):
+                draw.text((COLUMNS["unit"], y), label, font=font(size), fill="black", anchor="ra")
+                draw.text((COLUMNS["total"] - 10, y), money(value), font=font(size), fill="black", anchor="ra")
+                y += size + 16
+            if invoice.notes:
+                draw.text((MARGIN, y + 10), fit(invoice.notes, 20, right - MARGIN), font=font(20), fill="#555555")
+            if assets.signature is not None:
+                sig_y = PAGE_SIZE[1] - MARGIN - assets.signature.height - 30
+                page.paste(assets.signature, (right - assets.signature.width, sig_y))
+            signature_y = PAGE_SIZE[1] - MARGIN
+            draw.text((right, signature_y), "Authorised signature", font=font(20), fill="#555555", anchor="rd")
+        pages.append(page)
+    return pages
+
+
+def render_pdf(business: BusinessDoc, invoice: InvoiceDoc) -> tuple[bytes, int]:
+    pages = render_pages(business, invoice)
+    buffer = io.BytesIO()
+    pages[0].save(buffer, "PDF", resolution=DPI, save_all=True, append_images=pages[1:])
+    return buffer.getvalue(), len(pages)
+
+
+def render_receipt(business: BusinessDoc, invoice: InvoiceDoc) -> bytes:
+    header = business_assets(business).receipt_header
+    body_lines = 4 + 2 * len(invoice.items) + 4
+    receipt = Image.new("L", (RECEIPT_WIDTH, header.height + body_lines * RECEIPT_LINE + 2 * RECEIPT_MARGIN), 255)
+    receipt.paste(header, (0, 0))
+    draw = ImageDraw.Draw(receipt)
+    left, right = RECEIPT_MARGIN, RECEIPT_WIDTH - RECEIPT_MARGIN
+    width = right - left
+    y = header.height
+
+    def row(label: str, value: str = "", size: int = 20) -> None:
+        nonlocal y
+        draw.text((left, y), fit(label, size, width - 160), font=font(size), fill=0)
+        if value:
+            draw.text((right, y), value, font=font(size), fill=0, anchor="ra")
+        y += RECEIPT_LINE
+
+    row(invoice.number, invoice.date.isoformat())
+    row(invoice.customer_name or "Walk-in customer")
+    y += RECEIPT_LINE // 2
+    for item in invoice.items:
+        row(item.description)
+        row(f"  {item.quantity} x {money(item.unit_price_aed)}", money(item.line_total_aed))
+    draw.line((left, y + 4, right, y + 4), fill=0, width=1)
+    y += RECEIPT_LINE // 2
+    row("Subtotal", money(invoice.subtotal_aed))
+    row("VAT", money(invoice.vat_aed))
+    row("TOTAL AED", money(invoice.total_aed), 24)
+
+    buffer = io.BytesIO()
+    receipt.crop((0, 0, RECEIPT_WIDTH, y + RECEIPT_MARGIN)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def document_filename(number: str, suffix: str = ".pdf", taken: set[str] | None = None) -> str:
+    # Invoice numbers come from clients; the name is one path component without
+    # separators or leading dots, and gets a counter if `taken` already has it.
+    stem = _UNSAFE_FILENAME.sub("_", number).strip("._") or "invoice"
+    name, n = f"{stem}{suffix}", 1
+    while taken is not None and name in taken:
+        n += 1
+        name = f"{stem}-{n}{suffix}"
+    if taken is not None:
+        taken.add(name)
+    return name
+
+
+def render_pdf_batch(business: BusinessDoc, invoices: list[InvoiceDoc]) -> list[tuple[str, bytes, int]]:
+    # Runs in a worker process; the asset cache there is warm after the first chunk.
+    return [(invoice.number, *render_pdf(business, invoice)) for invoice in invoices]
+
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def render_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.render_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def shutdown_render_pool() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def render_archive(business: BusinessDoc, invoices: Iterable[InvoiceDoc], out: BinaryIO) -> tuple[int, int]:
+    # Chunks go to the pool as the query streams in, with at most two chunks per
+    # worker in flight, so memory stays flat however many invoices are in range.
+    executor = render_executor()
+    in_flight = deque()
+    documents = pages = 0
+    invoices = iter(invoices)
+    names: set[str] = set()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as archive:
+
+        def drain_one() -> None:
+            nonlocal documents, pages
+            for number, pdf, page_count in in_flight.popleft().result():
+                archive.writestr(document_filename(number, taken=names), pdf)
+                documents += 1
+                pages += page_count
+
+        while chunk := list(islice(invoices, RENDER_CHUNK)):
+            in_flight.append(executor.submit(render_pdf_batch, business, chunk))
+            if len(in_flight) >= 2 * settings.render_workers:
+                drain_one()
+        while in_flight:
+            drain_one()
+    return documents, pages
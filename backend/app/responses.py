@@ -0,0 +1,118 @@
+import os
+import re
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+_NOT_QUOTABLE = re.compile(r'[^\x20-\x7e]|["\\]')
+NDJSON = "application/x-ndjson"
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    # RFC 6266: an ASCII fallback for old clients and the UTF-8 name in filename*.
+    fallback = _NOT_QUOTABLE.sub("_", filename)
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    # Returns (offset, count) for a single range; multi-range, malformed and
+    # invalid (last before first) headers fall back to the whole file, as RFC
+    # 9110 requires. Only a valid range that misses the file is a 416.
+    match = _RANGE.fullmatch(header.strip()) if header else None
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first and last and int(last) < int(first):
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    return start, end - start + 1
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON in request.headers.get("accept", "")
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" and "x" match each other.
+    opaque = etag.removeprefix("W/")
+    return opaque in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+class StoredFileResponse(FileResponse):
+    # Sends [offset, offset + count) of a file. When the server implements the
+    # ASGI zero-copy extension the descriptor is handed over for sendfile(2).
+    def __init__(self, path: str, stat_result: os.stat_result, offset: int = 0, count: int | None = None, **kwargs):
+        self.offset = offset
+        self.count = stat_result.st_size - offset if count is None else count
+        headers = {**kwargs.pop("headers", {}), "content-length": str(self.count), "accept-ranges": "bytes"}
+        super().__init__(path, stat_result=stat_result, headers=headers, **kwargs)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                remaining = self.count
+                more_body = True
+                while more_body:
+                    chunk = await file.read(min(self.chunk_size, remaining))
+                    remaining -= len(chunk)
+                    more_body = remaining > 0 and bool(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if self.background is not None:
+            await self.background()
+
+
+def immutable_file_response(request: Request, path: str, etag: str) -> Response:
+    # For content-addressed files: the ETag never changes for a given name, so
+    # clients may cache forever and revalidation is a header comparison.
+    stat_result = os.stat(path)
+    headers = {"etag": etag, "cache-control": "public, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    requested = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if requested and if_range and if_range.strip() != etag:
+        requested = None
+    try:
+        window = byte_range(requested, stat_result.st_size)
+    except RangeNotSatisfiable as e:
+        return Response(status_code=416, headers={**headers, "content-range": str(e)})
+    if window is None:
+        return StoredFileResponse(path, stat_result, headers=headers)
+
+    offset, count = window
+    headers["content-range"] = f"bytes {offset}-{offset + count - 1}/{stat_result.st_size}"
+    return StoredFileResponse(path, stat_result, offset, count, status_code=206, headers=headers)
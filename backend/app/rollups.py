@@ -0,0 +1,111 @@
+import argparse
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import Connection, delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import DailySales, Invoice
+from .money import to_aed, to_fils
+
+
+# Drafts and voided invoices are not sales and stay out of the rollup.
+UNCOUNTED_STATUSES = ("draft", "void")
+AMOUNT_COLUMNS = ("invoice_count", "subtotal_aed", "vat_aed", "total_aed")
+MONEY_COLUMNS = AMOUNT_COLUMNS[1:]
+
+
+def sales_row(business_id: int, day: date, status: str | None, subtotal, vat, total, sign: int = 1) -> dict | None:
+    # Amounts are carried as integer fils and only turned back into AED for the upsert.
+    if status in UNCOUNTED_STATUSES:
+        return None
+    return {
+        "business_id": business_id,
+        "day": day,
+        "invoice_count": sign,
+        "subtotal_aed": sign * to_fils(subtotal),
+        "vat_aed": sign * to_fils(vat),
+        "total_aed": sign * to_fils(total),
+    }
+
+
+def invoice_sales(invoice: Invoice, sign: int = 1) -> dict | None:
+    return sales_row(
+        invoice.business_id,
+        invoice.date,
+        invoice.status,
+        invoice.subtotal_aed,
+        invoice.vat_aed,
+        invoice.total_aed,
+        sign,
+    )
+
+
+def apply_sales(db: Session, rows: Iterable[dict | None]) -> None:
+    merged: dict[tuple[int, date], dict] = {}
+    for row in rows:
+        if row is None:
+            continue
+        key = (row["business_id"], row["day"])
+        if key not in merged:
+            merged[key] = dict(row)
+        else:
+            for column in AMOUNT_COLUMNS:
+                merged[key][column] += row[column]
+    changes = [
+        {**r, **{c: to_aed(r[c]) for c in MONEY_COLUMNS}}
+        for r in merged.values()
+        if any(r[c] for c in AMOUNT_COLUMNS)
+    ]
+    if not changes:
+        return
+
+    upsert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = upsert(DailySales)
+    # SQLite keeps Numeric as REAL, so sums are rounded back to whole fils as they are stored.
+    set_ = {c: func.round(getattr(DailySales, c) + getattr(stmt.excluded, c), 2) for c in MONEY_COLUMNS}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySales.business_id, DailySales.day],
+        set_={"invoice_count": DailySales.invoice_count + stmt.excluded.invoice_count, **set_},
+    )
+    db.execute(stmt, changes)
+
+
+def rebuild_daily_sales(db: Session | Connection, business_id: int | None = None) -> None:
+    clear = delete(DailySales)
+    source = (
+        select(
+            Invoice.business_id,
+            Invoice.date,
+            func.count(),
+            func.round(func.sum(Invoice.subtotal_aed), 2),
+            func.round(func.sum(Invoice.vat_aed), 2),
+            func.round(func.sum(Invoice.total_aed), 2),
+        )
+        .where(Invoice.status.not_in(UNCOUNTED_STATUSES))
+        .group_by(Invoice.business_id, Invoice.date)
+    )
+    if business_id is not None:
+        clear = clear.where(DailySales.business_id == business_id)
+        source = source.where(Invoice.business_id == business_id)
+    db.execute(clear)
+    db.execute(insert(DailySales).from_select(["business_id", "day", *AMOUNT_COLUMNS], source))
+
+
+def main() -> None:
+    from .db import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="python -m app.rollups", description="Maintain the daily_sales rollup")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser("rebuild", help="recompute daily_sales from invoices in one pass")
+    rebuild.add_argument("--business-id", type=int, help="only rebuild this business")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        rebuild_daily_sales(db, args.business_id)
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from . import auth, businesses, products, customers, invoices, uploads, export
+from . import auth, businesses, products, customers, invoices, uploads, export, imports, reports, documents, monitoring
 
 __all__ = [
     "auth",
@@ -8,5 +8,9 @@ __all__ = [
     "invoices",
     "uploads",
     "export",
+    "imports",
+    "reports",
+    "documents",
+    "monitoring",
 ]
 
@@ -1,12 +1,17 @@
+import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import jwt, JWTError
-from passlib.context import CryptContext
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
+from ..cache import LRUCache
+from ..core import hashing
 from ..core.config import settings
 from ..db import get_db
 from ..models import User
@@ -14,17 +19,56 @@ from ..schemas import Token, UserCreate, UserOut
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = hashing.pwd_context
+
+# Verified principals keyed by raw token. A hit skips both the JWT signature
+# check and the users lookup; entries never outlive the token's own exp.
+token_cache = LRUCache(settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds)
+
+
+def invalidate_user(user_id: int) -> None:
+    token_cache.invalidate_where(lambda _, principal: principal["id"] == user_id)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_deactivated_user(mapper, connection, user: User) -> None:
+    if inspect(user).attrs.is_active.history.has_changes():
+        invalidate_user(user.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, user: User) -> None:
+    invalidate_user(user.id)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing.verify_password(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing.hash_password(password)
+
+
+async def run_hashing(fn, *args):
+    try:
+        return await hashing.hashing_pool.run(fn, *args)
+    except hashing.PoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    except Exception:
+        # A dead worker (the pool replaces it) or an error from the bcrypt backend.
+        logger.exception("Password hashing failed in %s", fn.__name__)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is unavailable, retry shortly",
+            headers={"Retry-After": "1"},
+        )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -35,6 +79,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+    principal = token_cache.get(token)
+    if principal is not None:
+        return User(**principal)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,28 +96,44 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
     except JWTError:
         raise credentials_exception
     user = db.get(User, int(user_id))
-    if user is None:
+    if user is None or not user.is_active:
         raise credentials_exception
+    ttl = min(settings.auth_cache_ttl_seconds, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(
+            token,
+            {"id": user.id, "email": user.email, "full_name": user.full_name, "is_active": user.is_active},
+            ttl=ttl,
+        )
     return user
 
 
 @router.post("/register", response_model=UserOut)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == user_in.email).first()
+async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(lambda: db.query(User).filter(User.email == user_in.email).first())
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(email=user_in.email, hashed_password=get_password_hash(user_in.password), full_name=user_in.full_name)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    hashed_password = await run_hashing(hashing.hash_password, user_in.password)
+    user = User(email=user_in.email, hashed_password=hashed_password, full_name=user_in.full_name)
+
+    def save() -> User:
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return await run_in_threadpool(save)
 
 
 @router.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.email == form_data.username).first())
+    if not user or not await run_hashing(hashing.verify_password, form_data.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect username or password")
     token = create_access_token({"sub": str(user.id)})
     return Token(access_token=token)
 
+
+@router.get("/me", response_model=UserOut)
+def read_me(user: User = Depends(get_current_user)):
+    return user
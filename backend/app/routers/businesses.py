@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..db import get_db, get_read_db
 from ..models import Business
 from ..schemas import BusinessCreate, BusinessOut
 
@@ -19,12 +19,12 @@ def create_business(payload: BusinessCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[BusinessOut])
-def list_businesses(db: Session = Depends(get_db)):
+def list_businesses(db: Session = Depends(get_read_db)):
     return db.query(Business).order_by(Business.id.desc()).all()
 
 
 @router.get("/{business_id}", response_model=BusinessOut)
-def get_business(business_id: int, db: Session = Depends(get_db)):
+def get_business(business_id: int, db: Session = Depends(get_read_db)):
     business = db.get(Business, business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
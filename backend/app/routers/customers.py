@@ -1,29 +1,90 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..db import get_async_read_db, get_db, get_read_db
 from ..models import Customer
-from ..schemas import CustomerCreate, CustomerOut
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, make_page
+from ..schemas import CustomerCreate, CustomerOut, Page
+from ..search import match_expression, matching_ids, ranked_ids, search_enabled
+from ..versions import bump_businesses, bump_versions, check_etag, listing_etag
 
 
 router = APIRouter()
+async_router = APIRouter()
 
 
 @router.post("/", response_model=CustomerOut)
 def create_customer(payload: CustomerCreate, db: Session = Depends(get_db)):
     customer = Customer(**payload.model_dump())
     db.add(customer)
+    bump_versions(db, payload.business_id, "customers")
     db.commit()
     db.refresh(customer)
     return customer
 
 
-@router.get("/", response_model=list[CustomerOut])
-def list_customers(business_id: int, q: str | None = Query(None), db: Session = Depends(get_db)):
+def query_customers(
+    db: Session, business_id: int, q: str | None = None, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None
+) -> dict:
     query = db.query(Customer).filter(Customer.business_id == business_id)
-    if q:
+    if q and search_enabled(db):
+        match = match_expression("customers", business_id, q)
+        if match:
+            query = query.filter(Customer.id.in_(matching_ids("customers", match)))
+    elif q:
         query = query.filter(Customer.name.ilike(f"%{q}%"))
-    return query.order_by(Customer.id.desc()).all()
+    if after:
+        (last_id,) = decode_cursor(after, int)
+        query = query.filter(Customer.id < last_id)
+    rows = query.order_by(Customer.id.desc()).limit(limit + 1).all()
+    return make_page(rows, limit, lambda r: (r.id,))
+
+
+@router.get("/", response_model=Page[CustomerOut])
+def list_customers(
+    request: Request,
+    response: Response,
+    business_id: int,
+    q: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    check_etag(request, response, listing_etag(db, business_id, "customers"))
+    return query_customers(db, business_id, q, limit, after)
+
+
+@async_router.get("/", response_model=Page[CustomerOut], include_in_schema=False)
+async def list_customers_async(
+    request: Request,
+    response: Response,
+    business_id: int,
+    q: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    check_etag(request, response, await db.run_sync(listing_etag, business_id, "customers"))
+    return await db.run_sync(query_customers, business_id, q, limit, after)
+
+
+@router.get("/search", response_model=list[CustomerOut])
+def search_customers(
+    business_id: int,
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    if not search_enabled(db):
+        query = db.query(Customer).filter(Customer.business_id == business_id, Customer.name.ilike(f"%{q}%"))
+        return query.order_by(Customer.name).limit(limit).all()
+    match = match_expression("customers", business_id, q)
+    if not match:
+        return []
+    ids = ranked_ids(db, "customers", match, limit)
+    rows = {r.id: r for r in db.query(Customer).filter(Customer.id.in_(ids))}
+    return [rows[i] for i in ids if i in rows]
 
 
 @router.put("/{customer_id}", response_model=CustomerOut)
@@ -31,6 +92,7 @@ def update_customer(customer_id: int, payload: CustomerCreate, db: Session = Dep
     customer = db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
+    bump_businesses(db, (customer.business_id, payload.business_id), "customers")
     for k, v in payload.model_dump().items():
         setattr(customer, k, v)
     db.commit()
@@ -44,6 +106,7 @@ def delete_customer(customer_id: int, db: Session = Depends(get_db)):
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     db.delete(customer)
+    bump_versions(db, customer.business_id, "customers")
     db.commit()
     return {"ok": True}
 
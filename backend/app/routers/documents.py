@@ -0,0 +1,136 @@
+import os
+import tempfile
+from datetime import date
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, Response
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session, selectinload
+from starlette.background import BackgroundTask
+
+from ..db import get_read_db
+from ..models import Business, Customer, Invoice
+from ..rendering import (
+    RENDER_CHUNK,
+    BusinessDoc,
+    InvoiceDoc,
+    LineDoc,
+    document_filename,
+    render_archive,
+    render_pdf,
+    render_receipt,
+)
+from ..responses import content_disposition
+
+
+router = APIRouter()
+
+
+def business_doc(business: Business) -> BusinessDoc:
+    return BusinessDoc(
+        id=business.id,
+        name=business.name,
+        address_line1=business.address_line1,
+        address_line2=business.address_line2,
+        contact_number1=business.contact_number1,
+        contact_number2=business.contact_number2,
+        trn=business.trn,
+        logo_path=business.logo_path,
+        signature_path=business.manager_signature_path,
+    )
+
+
+def invoice_query() -> Select:
+    return (
+        select(Invoice, Customer.name, Customer.trn)
+        .outerjoin(Customer, Customer.id == Invoice.customer_id)
+        .options(selectinload(Invoice.items))
+    )
+
+
+def invoice_doc(invoice: Invoice, customer_name: str | None, customer_trn: str | None) -> InvoiceDoc:
+    return InvoiceDoc(
+        number=invoice.number,
+        date=invoice.date,
+        due_date=invoice.due_date,
+        status=invoice.status,
+        customer_name=customer_name,
+        customer_trn=customer_trn,
+        notes=invoice.notes,
+        subtotal_aed=float(invoice.subtotal_aed),
+        vat_aed=float(invoice.vat_aed),
+        total_aed=float(invoice.total_aed),
+        items=tuple(
+            LineDoc(i.description, i.quantity, float(i.unit_price_aed), float(i.line_total_aed)) for i in invoice.items
+        ),
+    )
+
+
+def load_invoice(db: Session, invoice_id: int) -> tuple[BusinessDoc, InvoiceDoc]:
+    row = db.execute(invoice_query().where(Invoice.id == invoice_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    invoice = invoice_doc(*row)
+    return business_doc(db.get(Business, row[0].business_id)), invoice
+
+
+def stream_invoice_docs(db: Session, stmt: Select) -> Iterator[InvoiceDoc]:
+    # yield_per keeps one window of invoices (and their selectin-loaded items) in memory.
+    result = db.execute(stmt.execution_options(yield_per=RENDER_CHUNK * 4))
+    for row in result:
+        yield invoice_doc(*row)
+    db.expunge_all()
+
+
+@router.get("/invoices/{invoice_id}.pdf")
+def invoice_pdf(invoice_id: int, db: Session = Depends(get_read_db)):
+    business, invoice = load_invoice(db, invoice_id)
+    pdf, _ = render_pdf(business, invoice)
+    return Response(
+        pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": content_disposition("inline", document_filename(invoice.number))},
+    )
+
+
+@router.get("/invoices/{invoice_id}/receipt.png")
+def invoice_receipt(invoice_id: int, db: Session = Depends(get_read_db)):
+    business, invoice = load_invoice(db, invoice_id)
+    return Response(render_receipt(business, invoice), media_type="image/png")
+
+
+@router.get("/invoices.zip")
+def invoices_archive(
+    business_id: int,
+    start: date,
+    end: date,
+    status: str | None = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    business = db.get(Business, business_id)
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
+    stmt = (
+        invoice_query()
+        .where(Invoice.business_id == business_id, Invoice.date >= start, Invoice.date <= end)
+        .order_by(Invoice.date, Invoice.id)
+    )
+    if status:
+        stmt = stmt.where(Invoice.status == status)
+
+    # The archive is spooled to disk rather than memory and removed once sent.
+    fd, path = tempfile.mkstemp(suffix=".zip")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            documents, pages = render_archive(business_doc(business), stream_invoice_docs(db, stmt), out)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/zip",
+        filename=f"invoices-{business_id}-{start}-{end}.zip",
+        headers={"X-Rendered-Documents": str(documents), "X-Rendered-Pages": str(pages)},
+        background=BackgroundTask(os.unlink, path),
+    )
@@ -1,77 +1,106 @@
 import csv
 import io
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
+import zlib
+from typing import Callable, Iterable, Iterator
 
-from ..db import get_db
-from ..models import Product, Customer, Invoice, InvoiceItem
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from ..db import ReadSessionLocal
+from ..models import Product, Customer, Invoice
 
 
 router = APIRouter()
 
+BATCH_SIZE = 1000
+
 
-def to_csv(rows: list[dict]) -> str:
-    if not rows:
-        return ""
+def stream_csv(stmt: Select, header: list[str], to_row: Callable[[tuple], list]) -> Iterator[str]:
+    # The request-scoped session from get_db is closed before a streaming body
+    # is sent, so the generator owns its session for the lifetime of the download.
     with io.StringIO() as s:
-        writer = csv.DictWriter(s, fieldnames=list(rows[0].keys()))
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r)
-        return s.getvalue()
+        writer = csv.writer(s)
+        writer.writerow(header)
+        with ReadSessionLocal() as db:
+            result = db.execute(stmt.execution_options(yield_per=BATCH_SIZE))
+            for batch in result.partitions():
+                writer.writerows(to_row(r) for r in batch)
+                yield s.getvalue()
+                s.seek(0)
+                s.truncate(0)
+        yield s.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def csv_response(chunks: Iterator[str], filename: str, gzip: bool) -> StreamingResponse:
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.gz"'},
+        )
+    return StreamingResponse(chunks, media_type="text/csv")
 
 
 @router.get("/products.csv")
-def export_products(business_id: int, db: Session = Depends(get_db)):
-    items = db.query(Product).filter(Product.business_id == business_id).all()
-    rows = [
-        {
-            "id": p.id,
-            "business_id": p.business_id,
-            "name": p.name,
-            "sku": p.sku or "",
-            "price_aed": float(p.price_aed),
-            "stock_qty": p.stock_qty,
-        }
-        for p in items
-    ]
-    csv_str = to_csv(rows)
-    return Response(csv_str, media_type="text/csv")
+def export_products(business_id: int, gzip: bool = Query(False)):
+    stmt = select(
+        Product.id, Product.business_id, Product.name, Product.sku, Product.price_aed, Product.stock_qty
+    ).where(Product.business_id == business_id)
+    chunks = stream_csv(
+        stmt,
+        ["id", "business_id", "name", "sku", "price_aed", "stock_qty"],
+        lambda r: [r.id, r.business_id, r.name, r.sku or "", float(r.price_aed), r.stock_qty],
+    )
+    return csv_response(chunks, "products.csv", gzip)
 
 
 @router.get("/customers.csv")
-def export_customers(business_id: int, db: Session = Depends(get_db)):
-    items = db.query(Customer).filter(Customer.business_id == business_id).all()
-    rows = [
-        {
-            "id": c.id,
-            "business_id": c.business_id,
-            "name": c.name,
-            "contact": c.contact or "",
-            "trn": c.trn or "",
-        }
-        for c in items
-    ]
-    csv_str = to_csv(rows)
-    return Response(csv_str, media_type="text/csv")
+def export_customers(business_id: int, gzip: bool = Query(False)):
+    stmt = select(Customer.id, Customer.business_id, Customer.name, Customer.contact, Customer.trn).where(
+        Customer.business_id == business_id
+    )
+    chunks = stream_csv(
+        stmt,
+        ["id", "business_id", "name", "contact", "trn"],
+        lambda r: [r.id, r.business_id, r.name, r.contact or "", r.trn or ""],
+    )
+    return csv_response(chunks, "customers.csv", gzip)
 
 
 @router.get("/invoices.csv")
-def export_invoices(business_id: int, db: Session = Depends(get_db)):
-    items = db.query(Invoice).filter(Invoice.business_id == business_id).all()
-    rows = [
-        {
-            "id": i.id,
-            "number": i.number,
-            "date": i.date.isoformat(),
-            "due_date": i.due_date.isoformat() if i.due_date else "",
-            "subtotal_aed": float(i.subtotal_aed),
-            "vat_aed": float(i.vat_aed),
-            "total_aed": float(i.total_aed),
-            "status": i.status,
-        }
-        for i in items
-    ]
-    csv_str = to_csv(rows)
-    return Response(csv_str, media_type="text/csv")
-
+def export_invoices(business_id: int, gzip: bool = Query(False)):
+    stmt = select(
+        Invoice.id,
+        Invoice.number,
+        Invoice.date,
+        Invoice.due_date,
+        Invoice.subtotal_aed,
+        Invoice.vat_aed,
+        Invoice.total_aed,
+        Invoice.status,
+    ).where(Invoice.business_id == business_id)
+    chunks = stream_csv(
+        stmt,
+        ["id", "number", "date", "due_date", "subtotal_aed", "vat_aed", "total_aed", "status"],
+        lambda r: [
+            r.id,
+            r.number,
+            r.date.isoformat(),
+            r.due_date.isoformat() if r.due_date else "",
+            float(r.subtotal_aed),
+            float(r.vat_aed),
+            float(r.total_aed),
+            r.status,
+        ],
+    )
+    return csv_response(chunks, "invoices.csv", gzip)
@@ -0,0 +1,137 @@
+import csv
+import io
+from itertools import islice
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..cache import invalidate_business_skus
+from ..db import get_db
+from ..models import Business, Customer, Product
+from ..schemas import CustomerBase, ImportReport, ImportRowError, ProductBase
+from ..versions import bump_versions
+
+
+router = APIRouter()
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def record_error(report: ImportReport, line: int, message: str) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ImportRowError(row=line, error=message))
+
+
+def read_csv(file: UploadFile, report: ImportReport) -> Iterator[tuple[int, dict]]:
+    # Starlette spools uploads to disk, so wrapping the file keeps parsing incremental.
+    # Earlier batches are already committed when a bad line turns up, so it is
+    # reported like a validation error rather than failing the request.
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                record_error(report, reader.line_num, f"malformed CSV: {e}")
+                continue
+            except UnicodeDecodeError:
+                # The decoder cannot resynchronise, so nothing after this point is read.
+                record_error(report, reader.line_num + 1, "file is not UTF-8 text; import stopped here")
+                return
+            yield reader.line_num, {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}
+    finally:
+        text.detach()
+
+
+def validated_batches(rows: Iterator[tuple[int, dict]], model: type, report: ImportReport) -> Iterator[list]:
+    while batch := list(islice(rows, BATCH_SIZE)):
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((row, model.model_validate(row)))
+            except ValidationError as e:
+                message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                record_error(report, line, message)
+        yield valid
+
+
+def ensure_business(db: Session, business_id: int) -> None:
+    if not db.get(Business, business_id):
+        raise HTTPException(status_code=404, detail="Business not found")
+
+
+@router.post("/products.csv", response_model=ImportReport)
+def import_products(business_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    ensure_business(db, business_id)
+    report = ImportReport()
+    for batch in validated_batches(read_csv(file, report), ProductBase, report):
+        # Rows are upserted by (business_id, sku); a later row wins over an earlier one in the same batch.
+        by_sku: dict[str, ProductBase] = {}
+        new_rows: list[dict] = []
+        for _, product in batch:
+            if product.sku:
+                by_sku[product.sku] = product
+            else:
+                new_rows.append({"business_id": business_id, **product.model_dump()})
+        existing = dict(
+            db.execute(
+                select(Product.sku, Product.id).where(Product.business_id == business_id, Product.sku.in_(by_sku))
+            ).all()
+        )
+        # Updates only carry the columns the file filled in, so a price list
+        # without a stock_qty column leaves the live stock alone.
+        updates = [
+            {"id": existing[sku], **product.model_dump(exclude_unset=True)}
+            for sku, product in by_sku.items()
+            if sku in existing
+        ]
+        new_rows.extend(
+            {"business_id": business_id, **product.model_dump()} for sku, product in by_sku.items() if sku not in existing
+        )
+        if updates:
+            db.execute(update(Product), updates)
+        if new_rows:
+            db.execute(insert(Product), new_rows)
+        bump_versions(db, business_id, "products")
+        db.commit()
+        invalidate_business_skus(business_id)
+        report.updated += len(updates)
+        report.inserted += len(new_rows)
+    return report
+
+
+@router.post("/customers.csv", response_model=ImportReport)
+def import_customers(business_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    ensure_business(db, business_id)
+    report = ImportReport()
+    for batch in validated_batches(read_csv(file, report), CustomerBase, report):
+        # Rows carrying the id of an existing customer (as in customers.csv exports) update it in place.
+        ids = [int(row["id"]) for row, _ in batch if row.get("id", "").isdigit()]
+        existing = set(
+            db.scalars(select(Customer.id).where(Customer.business_id == business_id, Customer.id.in_(ids)))
+        )
+        updates: dict[int, dict] = {}
+        new_rows: list[dict] = []
+        for row, customer in batch:
+            row_id = int(row["id"]) if row.get("id", "").isdigit() else None
+            if row_id in existing:
+                updates[row_id] = {"id": row_id, **customer.model_dump(exclude_unset=True)}
+            else:
+                new_rows.append({"business_id": business_id, **customer.model_dump()})
+        if updates:
+            db.execute(update(Customer), list(updates.values()))
+        if new_rows:
+            db.execute(insert(Customer), new_rows)
+        bump_versions(db, business_id, "customers")
+        db.commit()
+        report.updated += len(updates)
+        report.inserted += len(new_rows)
+    return report
@@ -1,32 +1,92 @@
+from collections import Counter, defaultdict
 from datetime import date
-from typing import List
+from typing import AsyncIterator, Iterator, List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import Select, delete, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from ..db import get_db
-from ..models import Invoice, InvoiceItem
-from ..schemas import InvoiceCreate, InvoiceOut, InvoiceItemOut
-from ..utils import calculate_totals, generate_invoice_number
+from ..cache import invalidate_business_vat, invalidate_skus
+from ..db import AsyncReadSessionLocal, ReadSessionLocal, get_async_db, get_async_read_db, get_db, get_read_db
+from ..models import Business, Invoice, InvoiceItem
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, make_page
+from ..schemas import (
+    InvoiceBatchCreate,
+    InvoiceBatchOut,
+    InvoiceBatchResult,
+    InvoiceCreate,
+    InvoiceItemCreate,
+    InvoiceItemIn,
+    InvoiceOut,
+    InvoicePatch,
+    InvoiceUpdate,
+    Page,
+)
+from ..responses import NDJSON, wants_ndjson
+from ..rollups import apply_sales, invoice_sales, sales_row
+from ..sequences import next_invoice_sequence, reserve_invoice_sequences
+from ..stock import adjust_stock, held_stock, take_batch_stock
+from ..money import InvoiceTotals, invoice_totals, to_fils
+from ..utils import generate_invoice_number
+from ..versions import bump_businesses, bump_versions, check_etag, listing_etag
 
 
 router = APIRouter()
+# Async twins of the hot endpoints, mounted ahead of router when DB_ASYNC is on.
+# They run the same Session-based code through AsyncSession.run_sync.
+async_router = APIRouter()
 
 
-def compute_subtotal(items: List[dict]) -> float:
-    subtotal = 0.0
-    for item in items:
-        line_total = round(float(item["unit_price_aed"]) * int(item["quantity"]), 2)
-        subtotal += line_total
-    return round(subtotal, 2)
+def compute_totals(items: List[InvoiceItemCreate]) -> InvoiceTotals:
+    return invoice_totals((item.unit_price_aed, item.quantity) for item in items)
 
 
-@router.post("/", response_model=InvoiceOut)
-def create_invoice(payload: InvoiceCreate, db: Session = Depends(get_db)):
-    next_seq = (db.query(Invoice).count() or 0) + 1
-    number = payload.number or generate_invoice_number(next_seq)
-    subtotal = compute_subtotal([i.model_dump() for i in payload.items])
-    subtotal_aed, vat_aed, total_aed = calculate_totals(subtotal)
+STREAM_BATCH = 500
+
+
+def invoice_to_dict(invoice: Invoice) -> dict:
+    # Same shape as InvoiceOut. Endpoints hand it to ORJSONResponse directly,
+    # which skips the response_model validation pass; response_model stays for the schema.
+    return {
+        "id": invoice.id,
+        "business_id": invoice.business_id,
+        "customer_id": invoice.customer_id,
+        "number": invoice.number,
+        "date": invoice.date,
+        "due_date": invoice.due_date,
+        "notes": invoice.notes,
+        "subtotal_aed": float(invoice.subtotal_aed),
+        "vat_aed": float(invoice.vat_aed),
+        "total_aed": float(invoice.total_aed),
+        "status": invoice.status,
+        "items": [
+            {
+                "id": i.id,
+                "product_id": i.product_id,
+                "description": i.description,
+                "quantity": i.quantity,
+                "unit_price_aed": float(i.unit_price_aed),
+                "line_total_aed": float(i.line_total_aed),
+            }
+            for i in invoice.items
+        ],
+        "created_at": invoice.created_at,
+    }
+
+
+def ndjson_lines(invoices: List[Invoice]) -> bytes:
+    return b"".join(orjson.dumps(invoice_to_dict(inv), option=orjson.OPT_APPEND_NEWLINE) for inv in invoices)
+
+
+def insert_invoice(db: Session, payload: InvoiceCreate) -> dict:
+    number = payload.number or generate_invoice_number(
+        payload.business_id, next_invoice_sequence(db, payload.business_id)
+    )
+    totals = compute_totals(payload.items)
+    subtotal_aed, vat_aed, total_aed = totals.aed()
 
     invoice = Invoice(
         business_id=payload.business_id,
@@ -42,53 +102,203 @@ def create_invoice(payload: InvoiceCreate, db: Session = Depends(get_db)):
     )
     db.add(invoice)
     db.flush()
+    apply_sales(db, [invoice_sales(invoice)])
+    bump_versions(db, invoice.business_id, "invoices")
+    skus = adjust_stock(db, invoice.business_id, Counter(), held_stock(invoice.status, payload.items))
 
-    for item in payload.items:
-        line_total = round(item.unit_price_aed * item.quantity, 2)
-        db.add(
-            InvoiceItem(
-                invoice_id=invoice.id,
-                product_id=item.product_id,
-                description=item.description,
-                quantity=item.quantity,
-                unit_price_aed=item.unit_price_aed,
-                line_total_aed=line_total,
-            )
+    # One executemany for the lines; flushing them as ORM objects costs a
+    # round trip per line because each INSERT has to return its id.
+    if payload.items:
+        db.execute(
+            insert(InvoiceItem),
+            [
+                {
+                    "invoice_id": invoice.id,
+                    "product_id": item.product_id,
+                    "description": item.description,
+                    "quantity": item.quantity,
+                    "unit_price_aed": item.unit_price_aed,
+                    "line_total_aed": totals.line_aed(n),
+                }
+                for n, item in enumerate(payload.items)
+            ],
         )
 
     db.commit()
+    invalidate_business_vat(invoice.business_id)
+    invalidate_skus(invoice.business_id, skus)
     db.refresh(invoice)
 
-    items = db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).all()
-    return InvoiceOut(
-        id=invoice.id,
-        business_id=invoice.business_id,
-        customer_id=invoice.customer_id,
-        number=invoice.number,
-        date=invoice.date,
-        due_date=invoice.due_date,
-        notes=invoice.notes,
-        subtotal_aed=float(invoice.subtotal_aed),
-        vat_aed=float(invoice.vat_aed),
-        total_aed=float(invoice.total_aed),
-        status=invoice.status,
-        items=[
-            InvoiceItemOut(
-                id=i.id,
-                product_id=i.product_id,
-                description=i.description,
-                quantity=i.quantity,
-                unit_price_aed=float(i.unit_price_aed),
-                line_total_aed=float(i.line_total_aed),
-            )
-            for i in items
-        ],
-        created_at=invoice.created_at,
-    )
+    return invoice_to_dict(invoice)
+
+
+@router.post("/", response_model=InvoiceOut)
+def create_invoice(payload: InvoiceCreate, db: Session = Depends(get_db)):
+    return ORJSONResponse(insert_invoice(db, payload))
+
+
+@async_router.post("/", response_model=InvoiceOut, include_in_schema=False)
+async def create_invoice_async(payload: InvoiceCreate, db: AsyncSession = Depends(get_async_db)):
+    return ORJSONResponse(await db.run_sync(insert_invoice, payload))
+
+
+@router.post("/batch", response_model=InvoiceBatchOut)
+def create_invoices_batch(payload: InvoiceBatchCreate, db: Session = Depends(get_db)):
+    results: list[InvoiceBatchResult | None] = [None] * len(payload.invoices)
+
+    business_ids = {inv.business_id for inv in payload.invoices}
+    known_businesses = set(db.scalars(select(Business.id).where(Business.id.in_(business_ids))))
+    given_numbers = [inv.number for inv in payload.invoices if inv.number]
+    taken_numbers = set(db.scalars(select(Invoice.number).where(Invoice.number.in_(given_numbers))))
+
+    accepted: list[tuple[int, InvoiceCreate]] = []
+    for index, inv in enumerate(payload.invoices):
+        error = None
+        if inv.business_id not in known_businesses:
+            error = "Business not found"
+        elif inv.number and inv.number in taken_numbers:
+            error = "Invoice number already exists"
+        if error:
+            results[index] = InvoiceBatchResult(index=index, ok=False, number=inv.number, error=error)
+            continue
+        if inv.number:
+            taken_numbers.add(inv.number)
+        accepted.append((index, inv))
+
+    # Stock is taken before anything is inserted, so an invoice that would
+    # oversell is reported as failed and the rest of the batch still goes in.
+    by_business = defaultdict(list)
+    for index, inv in accepted:
+        by_business[inv.business_id].append((index, inv))
+    skus = {}
+    for business_id, entries in by_business.items():
+        holds = [held_stock(inv.status or "unpaid", inv.items) for _, inv in entries]
+        skus[business_id], errors = take_batch_stock(db, business_id, holds)
+        for (index, inv), error in zip(entries, errors):
+            if error:
+                results[index] = InvoiceBatchResult(index=index, ok=False, number=inv.number, error=error)
+    accepted = [(index, inv) for index, inv in accepted if results[index] is None]
+
+    # One sequence reservation per business covers every generated number in the batch.
+    needed = Counter(inv.business_id for _, inv in accepted if not inv.number)
+    sequences = {bid: iter(reserve_invoice_sequences(db, bid, n)) for bid, n in needed.items()}
+
+    invoice_rows = []
+    batch_totals = [compute_totals(inv.items) for _, inv in accepted]
+    for (_, inv), totals in zip(accepted, batch_totals):
+        subtotal_aed, vat_aed, total_aed = totals.aed()
+        invoice_rows.append(
+            {
+                "business_id": inv.business_id,
+                "customer_id": inv.customer_id,
+                "number": inv.number or generate_invoice_number(inv.business_id, next(sequences[inv.business_id])),
+                "date": inv.date or date.today(),
+                "due_date": inv.due_date,
+                "notes": inv.notes,
+                "subtotal_aed": subtotal_aed,
+                "vat_aed": vat_aed,
+                "total_aed": total_aed,
+                "status": inv.status or "unpaid",
+            }
+        )
+
+    if invoice_rows:
+        # RETURNING order is not guaranteed for multi-row inserts, so ids are matched back by number.
+        ids_by_number = dict(
+            db.execute(insert(Invoice).returning(Invoice.number, Invoice.id), invoice_rows).tuples().all()
+        )
+        invoice_ids = [ids_by_number[row["number"]] for row in invoice_rows]
+        item_rows = [
+            {
+                "invoice_id": invoice_id,
+                "product_id": item.product_id,
+                "description": item.description,
+                "quantity": item.quantity,
+                "unit_price_aed": item.unit_price_aed,
+                "line_total_aed": totals.line_aed(n),
+            }
+            for invoice_id, (_, inv), totals in zip(invoice_ids, accepted, batch_totals)
+            for n, item in enumerate(inv.items)
+        ]
+        if item_rows:
+            db.execute(insert(InvoiceItem), item_rows)
+        apply_sales(
+            db,
+            (
+                sales_row(r["business_id"], r["date"], r["status"], r["subtotal_aed"], r["vat_aed"], r["total_aed"])
+                for r in invoice_rows
+            ),
+        )
+        bump_businesses(db, (row["business_id"] for row in invoice_rows), "invoices")
+        db.commit()
+        for business_id in {row["business_id"] for row in invoice_rows}:
+            invalidate_business_vat(business_id)
+            invalidate_skus(business_id, skus[business_id])
+
+        for invoice_id, row, (index, _) in zip(invoice_ids, invoice_rows, accepted):
+            results[index] = InvoiceBatchResult(index=index, ok=True, id=invoice_id, number=row["number"])
+
+    return InvoiceBatchOut(created=len(accepted), failed=len(results) - len(accepted), results=results)
+
+
+def invoice_listing(
+    business_id: int,
+    status: str | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    customer_id: int | None = None,
+    min_total: float | None = None,
+    max_total: float | None = None,
+    after: str | None = None,
+) -> Select:
+    stmt = select(Invoice).where(Invoice.business_id == business_id)
+    if status:
+        stmt = stmt.where(Invoice.status == status)
+    if start:
+        stmt = stmt.where(Invoice.date >= start)
+    if end:
+        stmt = stmt.where(Invoice.date <= end)
+    if customer_id:
+        stmt = stmt.where(Invoice.customer_id == customer_id)
+    if min_total is not None:
+        stmt = stmt.where(Invoice.total_aed >= min_total)
+    if max_total is not None:
+        stmt = stmt.where(Invoice.total_aed <= max_total)
+
+    if after:
+        last_date, last_id = decode_cursor(after, date.fromisoformat, int)
+        stmt = stmt.where(tuple_(Invoice.date, Invoice.id) < (last_date, last_id))
+
+    # Items for each page (or streamed batch) are fetched in a single IN query.
+    return stmt.options(selectinload(Invoice.items)).order_by(Invoice.date.desc(), Invoice.id.desc())
+
+
+def query_invoices(db: Session, stmt: Select, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    invoices = db.scalars(stmt.limit(limit + 1)).all()
+    page = make_page(invoices, limit, lambda inv: (inv.date.isoformat(), inv.id))
+    page["items"] = [invoice_to_dict(inv) for inv in page["items"]]
+    return page
 
 
-@router.get("/", response_model=list[InvoiceOut])
+def stream_invoices(stmt: Select) -> Iterator[bytes]:
+    # Like the CSV exports, the generator owns its session because the
+    # request-scoped one is closed before a streaming body is sent.
+    with ReadSessionLocal() as db:
+        for batch in db.scalars(stmt.execution_options(yield_per=STREAM_BATCH)).partitions():
+            yield ndjson_lines(batch)
+
+
+async def stream_invoices_async(stmt: Select) -> AsyncIterator[bytes]:
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream_scalars(stmt.execution_options(yield_per=STREAM_BATCH))
+        async for batch in result.partitions():
+            yield ndjson_lines(batch)
+
+
+@router.get("/", response_model=Page[InvoiceOut])
 def list_invoices(
+    request: Request,
+    response: Response,
     business_id: int,
     status: str | None = Query(None),
     start: date | None = Query(None),
@@ -96,118 +306,167 @@ def list_invoices(
     customer_id: int | None = Query(None),
     min_total: float | None = Query(None),
     max_total: float | None = Query(None),
-    db: Session = Depends(get_db),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: Session = Depends(get_read_db),
 ):
-    q = db.query(Invoice).filter(Invoice.business_id == business_id)
-    if status:
-        q = q.filter(Invoice.status == status)
-    if start:
-        q = q.filter(Invoice.date >= start)
-    if end:
-        q = q.filter(Invoice.date <= end)
-    if customer_id:
-        q = q.filter(Invoice.customer_id == customer_id)
-    if min_total is not None:
-        q = q.filter(Invoice.total_aed >= min_total)
-    if max_total is not None:
-        q = q.filter(Invoice.total_aed <= max_total)
-
-    invoices = q.order_by(Invoice.id.desc()).all()
-    results: list[InvoiceOut] = []
-    for inv in invoices:
-        items = db.query(InvoiceItem).filter(InvoiceItem.invoice_id == inv.id).all()
-        results.append(
-            InvoiceOut(
-                id=inv.id,
-                business_id=inv.business_id,
-                customer_id=inv.customer_id,
-                number=inv.number,
-                date=inv.date,
-                due_date=inv.due_date,
-                notes=inv.notes,
-                subtotal_aed=float(inv.subtotal_aed),
-                vat_aed=float(inv.vat_aed),
-                total_aed=float(inv.total_aed),
-                status=inv.status,
-                items=[
-                    InvoiceItemOut(
-                        id=i.id,
-                        product_id=i.product_id,
-                        description=i.description,
-                        quantity=i.quantity,
-                        unit_price_aed=float(i.unit_price_aed),
-                        line_total_aed=float(i.line_total_aed),
-                    )
-                    for i in items
-                ],
-                created_at=inv.created_at,
-            )
-        )
-    return results
+    # With Accept: application/x-ndjson every invoice after the cursor is
+    # streamed, one JSON object per line, instead of a single page.
+    ndjson = wants_ndjson(request)
+    check_etag(request, response, listing_etag(db, business_id, "invoices", "ndjson" if ndjson else ""))
+    response.headers["Vary"] = "Accept"
+    stmt = invoice_listing(business_id, status, start, end, customer_id, min_total, max_total, after)
+    if ndjson:
+        return StreamingResponse(stream_invoices(stmt), media_type=NDJSON, headers=response.headers)
+    return ORJSONResponse(query_invoices(db, stmt, limit), headers=response.headers)
 
 
-@router.put("/{invoice_id}", response_model=InvoiceOut)
-def update_invoice(invoice_id: int, payload: InvoiceCreate, db: Session = Depends(get_db)):
-    invoice = db.get(Invoice, invoice_id)
-    if not invoice:
-        raise HTTPException(status_code=404, detail="Invoice not found")
+@async_router.get("/", response_model=Page[InvoiceOut], include_in_schema=False)
+async def list_invoices_async(
+    request: Request,
+    response: Response,
+    business_id: int,
+    status: str | None = Query(None),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+    customer_id: int | None = Query(None),
+    min_total: float | None = Query(None),
+    max_total: float | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    ndjson = wants_ndjson(request)
+    etag = await db.run_sync(listing_etag, business_id, "invoices", "ndjson" if ndjson else "")
+    check_etag(request, response, etag)
+    response.headers["Vary"] = "Accept"
+    stmt = invoice_listing(business_id, status, start, end, customer_id, min_total, max_total, after)
+    if ndjson:
+        return StreamingResponse(stream_invoices_async(stmt), media_type=NDJSON, headers=response.headers)
+    return ORJSONResponse(await db.run_sync(query_invoices, stmt, limit), headers=response.headers)
 
-    invoice.customer_id = payload.customer_id
-    invoice.date = payload.date or invoice.date
-    invoice.due_date = payload.due_date
-    invoice.notes = payload.notes
-    invoice.status = payload.status or invoice.status
 
-    db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).delete()
+def same_line(line: InvoiceItem, item: InvoiceItemIn) -> bool:
+    return (
+        line.product_id == item.product_id
+        and line.description == item.description
+        and line.quantity == item.quantity
+        and to_fils(line.unit_price_aed) == to_fils(item.unit_price_aed)
+    )
 
-    subtotal = compute_subtotal([i.model_dump() for i in payload.items])
-    subtotal_aed, vat_aed, total_aed = calculate_totals(subtotal)
-    invoice.subtotal_aed = subtotal_aed
-    invoice.vat_aed = vat_aed
-    invoice.total_aed = total_aed
 
-    db.flush()
-    for item in payload.items:
-        line_total = round(item.unit_price_aed * item.quantity, 2)
-        db.add(
-            InvoiceItem(
-                invoice_id=invoice.id,
-                product_id=item.product_id,
-                description=item.description,
-                quantity=item.quantity,
-                unit_price_aed=item.unit_price_aed,
-                line_total_aed=line_total,
+def sync_items(db: Session, invoice: Invoice, items: List[InvoiceItemIn]) -> bool:
+    # Diffs the incoming lines against the stored ones and writes only what
+    # changed. Returns whether any line was inserted, updated or deleted.
+    existing = {line.id: line for line in invoice.items}
+    matched: list[InvoiceItem | None] = []
+    for item in items:
+        line = existing.pop(item.id, None) if item.id is not None else None
+        if item.id is not None and line is None:
+            raise HTTPException(status_code=422, detail=f"Item {item.id} is not a line of this invoice")
+        matched.append(line)
+    # Lines sent without an id (a client resending the whole invoice) keep an identical stored line.
+    for n, item in enumerate(items):
+        if matched[n] is None:
+            line = next((line for line in existing.values() if same_line(line, item)), None)
+            if line is not None:
+                matched[n] = existing.pop(line.id)
+    removed = list(existing)
+
+    amounts_changed = bool(removed) or any(
+        line is None
+        or line.quantity != item.quantity
+        or to_fils(line.unit_price_aed) != to_fils(item.unit_price_aed)
+        for line, item in zip(matched, items)
+    )
+    if not amounts_changed and all(same_line(line, item) for line, item in zip(matched, items)):
+        return False
+
+    if removed:
+        db.execute(delete(InvoiceItem).where(InvoiceItem.id.in_(removed)))
+    totals = compute_totals(items) if amounts_changed else None
+    for n, (line, item) in enumerate(zip(matched, items)):
+        if line is None:
+            db.add(
+                InvoiceItem(
+                    invoice_id=invoice.id,
+                    product_id=item.product_id,
+                    description=item.description,
+                    quantity=item.quantity,
+                    unit_price_aed=item.unit_price_aed,
+                    line_total_aed=totals.line_aed(n),
+                )
             )
-        )
+            continue
+        if same_line(line, item):
+            continue
+        line.product_id = item.product_id
+        line.description = item.description
+        line.quantity = item.quantity
+        if to_fils(line.unit_price_aed) != to_fils(item.unit_price_aed):
+            line.unit_price_aed = item.unit_price_aed
+        if totals is not None and to_fils(line.line_total_aed) != totals.lines[n]:
+            line.line_total_aed = totals.line_aed(n)
+    if totals is not None:
+        invoice.subtotal_aed, invoice.vat_aed, invoice.total_aed = totals.aed()
+    return True
+
+
+def apply_invoice_update(db: Session, invoice: Invoice, fields: dict, items: List[InvoiceItemIn] | None) -> dict:
+    # Header fields are only written when they differ and totals are only
+    # recomputed when the lines did; an edit that changes nothing writes nothing.
+    previous_sales = invoice_sales(invoice, -1)
+    moves_stock = items is not None or "status" in fields
+    previous_stock = held_stock(invoice.status, invoice.items) if moves_stock else Counter()
+    changed = False
+    for name, value in fields.items():
+        if getattr(invoice, name) != value:
+            setattr(invoice, name, value)
+            changed = True
+    if items is not None:
+        changed = sync_items(db, invoice, items) or changed
+    if not changed:
+        return invoice_to_dict(invoice)
+
+    apply_sales(db, [previous_sales, invoice_sales(invoice)])
+    bump_versions(db, invoice.business_id, "invoices")
+    skus = []
+    if moves_stock:
+        current_stock = held_stock(invoice.status, invoice.items if items is None else items)
+        skus = adjust_stock(db, invoice.business_id, previous_stock, current_stock)
     db.commit()
+    invalidate_business_vat(invoice.business_id)
+    invalidate_skus(invoice.business_id, skus)
     db.refresh(invoice)
+    return invoice_to_dict(invoice)
 
-    items = db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).all()
-    return InvoiceOut(
-        id=invoice.id,
-        business_id=invoice.business_id,
-        customer_id=invoice.customer_id,
-        number=invoice.number,
-        date=invoice.date,
-        due_date=invoice.due_date,
-        notes=invoice.notes,
-        subtotal_aed=float(invoice.subtotal_aed),
-        vat_aed=float(invoice.vat_aed),
-        total_aed=float(invoice.total_aed),
-        status=invoice.status,
-        items=[
-            InvoiceItemOut(
-                id=i.id,
-                product_id=i.product_id,
-                description=i.description,
-                quantity=i.quantity,
-                unit_price_aed=float(i.unit_price_aed),
-                line_total_aed=float(i.line_total_aed),
-            )
-            for i in items
-        ],
-        created_at=invoice.created_at,
-    )
+
+@router.put("/{invoice_id}", response_model=InvoiceOut)
+def update_invoice(invoice_id: int, payload: InvoiceUpdate, db: Session = Depends(get_db)):
+    invoice = db.get(Invoice, invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    fields = {
+        "customer_id": payload.customer_id,
+        "date": payload.date or invoice.date,
+        "due_date": payload.due_date,
+        "notes": payload.notes,
+        "status": payload.status or invoice.status,
+    }
+    return ORJSONResponse(apply_invoice_update(db, invoice, fields, payload.items))
+
+
+@router.patch("/{invoice_id}", response_model=InvoiceOut)
+def patch_invoice(invoice_id: int, payload: InvoicePatch, db: Session = Depends(get_db)):
+    invoice = db.get(Invoice, invoice_id)
+    if not invoice:
+        raise HTTPException(status_code=404, detail="Invoice not found")
+    fields = payload.model_dump(exclude_unset=True, exclude={"items"})
+    # date and status cannot be cleared; a null leaves them unchanged.
+    for name in ("date", "status"):
+        if name in fields and fields[name] is None:
+            del fields[name]
+    return ORJSONResponse(apply_invoice_update(db, invoice, fields, payload.items))
 
 
 @router.delete("/{invoice_id}")
@@ -215,8 +474,13 @@ def delete_invoice(invoice_id: int, db: Session = Depends(get_db)):
     invoice = db.get(Invoice, invoice_id)
     if not invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice.id).delete()
+    apply_sales(db, [invoice_sales(invoice, -1)])
+    bump_versions(db, invoice.business_id, "invoices")
+    # The items are loaded now, so the cascade deletes them along with the invoice.
+    skus = adjust_stock(db, invoice.business_id, held_stock(invoice.status, invoice.items), Counter())
     db.delete(invoice)
     db.commit()
+    invalidate_business_vat(invoice.business_id)
+    invalidate_skus(invoice.business_id, skus)
     return {"ok": True}
 
@@ -0,0 +1,93 @@
+from typing import Iterable
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import metrics
+from ..cache import sku_cache, vat_report_cache
+from ..core.hashing import hashing_pool
+from ..db import async_engines, engines, pool_stats
+from .auth import token_cache
+
+
+router = APIRouter()
+
+CACHES = {"sku": sku_cache, "vat_report": vat_report_cache, "auth_token": token_cache}
+
+
+def collect_pools() -> Iterable[str]:
+    pools = {name: pool_stats(engine) for name, engine in engines().items()}
+    pools = {name: stats for name, stats in pools.items() if stats}
+    for field in ("size", "checked_out", "overflow", "idle"):
+        yield from metrics.gauge(
+            f"db_pool_{field}",
+            f"Connection pool {field.replace('_', ' ')} connections",
+            ("engine",),
+            {(name,): stats[field] for name, stats in pools.items()},
+        )
+
+
+def collect_caches() -> Iterable[str]:
+    stats = {(name,): cache.stats() for name, cache in CACHES.items()}
+    yield from metrics.gauge("cache_entries", "Entries held", ("cache",), {k: s["size"] for k, s in stats.items()})
+    for field in ("hits", "misses"):
+        samples = {k: s[field] for k, s in stats.items()}
+        yield from metrics.gauge(f"cache_{field}_total", f"Cache lookup {field}", ("cache",), samples, "counter")
+
+
+def collect_hashing() -> Iterable[str]:
+    stats = hashing_pool.stats()
+    yield from metrics.gauge("password_hash_pending", "Hash jobs queued or running", (), {(): stats["pending"]})
+    yield from metrics.gauge(
+        "password_hash_rejected_total", "Hash jobs rejected while saturated", (), {(): stats["rejected"]}, "counter"
+    )
+
+
+metrics.collectors.extend([collect_pools, collect_caches, collect_hashing])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def ping(engine: Engine) -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+@router.get("/health/ready")
+async def readiness():
+    ready = True
+    databases = {}
+    async_named = async_engines()
+    for name, engine in engines().items():
+        state: dict = {}
+        stats = pool_stats(engine)
+        if stats:
+            state["pool"] = stats
+            state["saturated"] = stats["checked_out"] >= stats["size"] + stats["max_overflow"]
+            ready = ready and not state["saturated"]
+        # A saturated pool would block the probe for the full pool timeout, so it
+        # skips the ping. Async engines are pinged through their own driver, as
+        # their sync facade cannot be driven from a thread.
+        if not state.get("saturated"):
+            try:
+                if name in async_named:
+                    async with async_named[name].connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+                else:
+                    await run_in_threadpool(ping, engine)
+                state["ok"] = True
+            except SQLAlchemyError as e:
+                state["ok"] = False
+                state["error"] = e.__class__.__name__
+                ready = False
+        databases[name] = state
+    return JSONResponse(
+        {"status": "ok" if ready else "unavailable", "databases": databases},
+        status_code=200 if ready else 503,
+    )
@@ -1,29 +1,119 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..db import get_db
+from ..cache import sku_cache
+from ..db import get_async_read_db, get_db, get_read_db
 from ..models import Product
-from ..schemas import ProductCreate, ProductOut
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, make_page
+from ..schemas import ProductCreate, ProductOut, Page
+from ..search import match_expression, matching_ids, ranked_ids, search_enabled
+from ..versions import bump_businesses, bump_versions, check_etag, current_version, listing_etag
 
 
 router = APIRouter()
+async_router = APIRouter()
 
 
 @router.post("/", response_model=ProductOut)
 def create_product(payload: ProductCreate, db: Session = Depends(get_db)):
     product = Product(**payload.model_dump())
     db.add(product)
+    bump_versions(db, payload.business_id, "products")
     db.commit()
+    sku_cache.invalidate((payload.business_id, payload.sku))
     db.refresh(product)
     return product
 
 
-@router.get("/", response_model=list[ProductOut])
-def list_products(business_id: int, q: str | None = Query(None), db: Session = Depends(get_db)):
+def query_products(
+    db: Session, business_id: int, q: str | None = None, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None
+) -> dict:
     query = db.query(Product).filter(Product.business_id == business_id)
-    if q:
+    if q and search_enabled(db):
+        match = match_expression("products", business_id, q)
+        if match:
+            query = query.filter(Product.id.in_(matching_ids("products", match)))
+    elif q:
         query = query.filter(Product.name.ilike(f"%{q}%"))
-    return query.order_by(Product.id.desc()).all()
+    if after:
+        (last_id,) = decode_cursor(after, int)
+        query = query.filter(Product.id < last_id)
+    rows = query.order_by(Product.id.desc()).limit(limit + 1).all()
+    return make_page(rows, limit, lambda r: (r.id,))
+
+
+@router.get("/", response_model=Page[ProductOut])
+def list_products(
+    request: Request,
+    response: Response,
+    business_id: int,
+    q: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: Session = Depends(get_read_db),
+):
+    check_etag(request, response, listing_etag(db, business_id, "products"))
+    return query_products(db, business_id, q, limit, after)
+
+
+@async_router.get("/", response_model=Page[ProductOut], include_in_schema=False)
+async def list_products_async(
+    request: Request,
+    response: Response,
+    business_id: int,
+    q: str | None = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    check_etag(request, response, await db.run_sync(listing_etag, business_id, "products"))
+    return await db.run_sync(query_products, business_id, q, limit, after)
+
+
+@router.get("/search", response_model=list[ProductOut])
+def search_products(
+    business_id: int,
+    q: str,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    if not search_enabled(db):
+        query = db.query(Product).filter(Product.business_id == business_id, Product.name.ilike(f"%{q}%"))
+        return query.order_by(Product.name).limit(limit).all()
+    match = match_expression("products", business_id, q)
+    if not match:
+        return []
+    ids = ranked_ids(db, "products", match, limit)
+    rows = {r.id: r for r in db.query(Product).filter(Product.id.in_(ids))}
+    return [rows[i] for i in ids if i in rows]
+
+
+@router.get("/by-sku/{sku:path}", response_model=ProductOut)
+def get_product_by_sku(sku: str, business_id: int, db: Session = Depends(get_read_db)):
+    # Entries carry the products data version read before the product, so one
+    # filled from a read that raced a write is never served after it.
+    key = (business_id, sku)
+    version = current_version(db, business_id, "products")
+    cached = sku_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    row = (
+        db.query(Product)
+        .filter(Product.business_id == business_id, Product.sku == sku)
+        .order_by(Product.id)
+        .first()
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Product not found")
+    product = ProductOut.model_validate(row)
+    sku_cache.set(key, (version, product))
+    return product
+
+
+@router.get("/sku-cache/stats")
+def sku_cache_stats() -> dict:
+    return sku_cache.stats()
 
 
 @router.put("/{product_id}", response_model=ProductOut)
@@ -31,9 +121,13 @@ def update_product(product_id: int, payload: ProductCreate, db: Session = Depend
     product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    old_key = (product.business_id, product.sku)
+    bump_businesses(db, (product.business_id, payload.business_id), "products")
     for k, v in payload.model_dump().items():
         setattr(product, k, v)
     db.commit()
+    sku_cache.invalidate(old_key)
+    sku_cache.invalidate((payload.business_id, payload.sku))
     db.refresh(product)
     return product
 
@@ -43,7 +137,10 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
     product = db.get(Product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    key = (product.business_id, product.sku)
     db.delete(product)
+    bump_versions(db, product.business_id, "products")
     db.commit()
+    sku_cache.invalidate(key)
     return {"ok": True}
 
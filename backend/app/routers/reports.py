@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..cache import vat_report_cache
+from ..db import get_read_db
+from ..models import DailySales, Invoice
+from ..money import to_aed, to_fils
+from ..recompute import fils
+from ..rollups import MONEY_COLUMNS, UNCOUNTED_STATUSES
+from ..schemas import SalesPeriodOut, VatReturnOut, VatStatusLine
+from ..versions import current_version
+
+
+router = APIRouter()
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+@router.get("/sales", response_model=List[SalesPeriodOut])
+def sales_report(
+    business_id: int,
+    start: date,
+    end: date,
+    granularity: Literal["day", "week", "month"] = Query("day"),
+    db: Session = Depends(get_read_db),
+):
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    rows = db.execute(
+        select(DailySales)
+        .where(DailySales.business_id == business_id, DailySales.day >= start, DailySales.day <= end)
+        .order_by(DailySales.day)
+    ).scalars()
+
+    periods: dict[date, dict] = {}
+    for row in rows:
+        if not row.invoice_count:
+            continue
+        key = period_start(row.day, granularity)
+        # Summed in integer fils so long periods add up exactly.
+        period = periods.setdefault(
+            key, {"period": key, "invoice_count": 0, "subtotal_aed": 0, "vat_aed": 0, "total_aed": 0}
+        )
+        period["invoice_count"] += row.invoice_count
+        for column in MONEY_COLUMNS:
+            period[column] += to_fils(getattr(row, column))
+
+    for period in periods.values():
+        for column in MONEY_COLUMNS:
+            period[column] = float(to_aed(period[column]))
+    return list(periods.values())
+
+
+@router.get("/vat-return", response_model=VatReturnOut)
+def vat_return(business_id: int, start: date, end: date, db: Session = Depends(get_read_db)):
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    # A period that has ended only changes through edits to its invoices, so
+    # closed periods are served from cache. The key includes the business's
+    # invoices data version, read before the totals: a report computed while a
+    # write lands is filed under the old version and never served after it.
+    closed = end < date.today()
+    if closed:
+        key = (business_id, start, end, current_version(db, business_id, "invoices"))
+        cached = vat_report_cache.get(key)
+        if cached is not None:
+            return cached
+
+    rows = db.execute(
+        select(
+            Invoice.status,
+            func.count(),
+            # Summed in integer fils, as the invoice totals are computed.
+            func.sum(fils(Invoice.subtotal_aed)),
+            func.sum(fils(Invoice.vat_aed)),
+            func.sum(fils(Invoice.total_aed)),
+        )
+        .where(
+            Invoice.business_id == business_id,
+            Invoice.date >= start,
+            Invoice.date <= end,
+            Invoice.status.not_in(UNCOUNTED_STATUSES),
+        )
+        .group_by(Invoice.status)
+        .order_by(Invoice.status)
+    ).all()
+    lines = [
+        VatStatusLine(
+            status=status,
+            invoice_count=count,
+            taxable_supplies_aed=float(to_aed(subtotal)),
+            output_vat_aed=float(to_aed(vat)),
+            total_aed=float(to_aed(total)),
+        )
+        for status, count, subtotal, vat, total in rows
+    ]
+    report = VatReturnOut(
+        business_id=business_id,
+        start=start,
+        end=end,
+        closed=closed,
+        invoice_count=sum(row[1] for row in rows),
+        taxable_supplies_aed=float(to_aed(sum(row[2] for row in rows))),
+        output_vat_aed=float(to_aed(sum(row[3] for row in rows))),
+        total_aed=float(to_aed(sum(row[4] for row in rows))),
+        by_status=lines,
+    )
+    if closed:
+        vat_report_cache.set(key, report)
+    return report
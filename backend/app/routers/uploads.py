@@ -1,42 +1,71 @@
 import os
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Request, UploadFile
 from sqlalchemy.orm import Session
 
-from ..core.config import settings
 from ..db import get_db
 from ..models import Business
+from ..responses import immutable_file_response
+from ..storage import STORED_NAME, StoredFile, UploadTooLarge, make_variants, object_path, store_stream
 
 
 router = APIRouter()
 
 
-def save_file(file: UploadFile, subdir: str) -> str:
-    os.makedirs(os.path.join(settings.upload_dir, subdir), exist_ok=True)
-    filename = file.filename or "upload.bin"
-    path = os.path.join(settings.upload_dir, subdir, filename)
-    with open(path, "wb") as f:
-        f.write(file.file.read())
-    return path
+def save_file(file: UploadFile, background_tasks: BackgroundTasks) -> StoredFile:
+    # Copied from the spooled upload in fixed-size chunks, hashed on the way.
+    try:
+        stored = store_stream(file.file, file.filename)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    background_tasks.add_task(make_variants, stored.path)
+    return stored
+
+
+def stored_out(stored: StoredFile) -> dict:
+    return {
+        "path": stored.path,
+        "url": f"/api/uploads/files/{stored.name}",
+        "sha256": stored.sha256,
+        "size": stored.size,
+    }
 
 
 @router.post("/business/{business_id}/logo")
-def upload_business_logo(business_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def upload_business_logo(
+    business_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
     business = db.get(Business, business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    path = save_file(file, f"business_{business_id}")
-    business.logo_path = path
+    stored = save_file(file, background_tasks)
+    business.logo_path = stored.path
     db.commit()
-    return {"path": path}
+    return stored_out(stored)
 
 
 @router.post("/business/{business_id}/signature")
-def upload_manager_signature(business_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+def upload_manager_signature(
+    business_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
     business = db.get(Business, business_id)
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    path = save_file(file, f"business_{business_id}")
-    business.manager_signature_path = path
+    stored = save_file(file, background_tasks)
+    business.manager_signature_path = stored.path
     db.commit()
-    return {"path": path}
+    return stored_out(stored)
+
 
+@router.get("/files/{name}")
+@router.head("/files/{name}", include_in_schema=False)
+def stored_file(name: str, request: Request):
+    path = object_path(name)
+    if not STORED_NAME.fullmatch(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return immutable_file_response(request, path, f'"{os.path.splitext(name)[0]}"')
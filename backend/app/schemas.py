@@ -1,10 +1,18 @@
+import datetime as dt
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Generic, List, Optional, TypeVar
 from pydantic import BaseModel, Field
 
 
 AED = Field(description="Amount in AED", examples=["100.00"])  # cosmetic
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 
 class Token(BaseModel):
     access_token: str
@@ -104,8 +112,8 @@ class InvoiceBase(BaseModel):
     business_id: int
     customer_id: Optional[int] = None
     number: Optional[str] = None
-    date: Optional[date] = None
-    due_date: Optional[date] = None
+    date: Optional[dt.date] = None
+    due_date: Optional[dt.date] = None
     notes: Optional[str] = None
     status: Optional[str] = None
 
@@ -114,13 +122,36 @@ class InvoiceCreate(InvoiceBase):
     items: List[InvoiceItemCreate]
 
 
+class InvoiceItemIn(InvoiceItemCreate):
+    # Set to edit an existing line in place; lines without an id are new.
+    id: Optional[int] = None
+
+
+class InvoiceUpdate(InvoiceBase):
+    items: List[InvoiceItemIn]
+
+
+class InvoicePatch(BaseModel):
+    customer_id: Optional[int] = None
+    date: Optional[dt.date] = None
+    due_date: Optional[dt.date] = None
+    notes: Optional[str] = None
+    status: Optional[str] = None
+    # The full list of lines after the edit; leave it out to keep them as they are.
+    items: Optional[List[InvoiceItemIn]] = None
+
+
+class InvoiceBatchCreate(BaseModel):
+    invoices: List[InvoiceCreate] = Field(max_length=1000)
+
+
 class InvoiceOut(BaseModel):
     id: int
     business_id: int
     customer_id: Optional[int]
     number: str
     date: date
-    due_date: Optional[date]
+    due_date: Optional[dt.date]
     notes: Optional[str]
     subtotal_aed: float
     vat_aed: float
@@ -132,3 +163,56 @@ class InvoiceOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+class InvoiceBatchResult(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[int] = None
+    number: Optional[str] = None
+    error: Optional[str] = None
+
+
+class InvoiceBatchOut(BaseModel):
+    created: int
+    failed: int
+    results: List[InvoiceBatchResult]
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+
+class SalesPeriodOut(BaseModel):
+    period: date
+    invoice_count: int
+    subtotal_aed: float
+    vat_aed: float
+    total_aed: float
+
+
+class VatStatusLine(BaseModel):
+    status: str
+    invoice_count: int
+    taxable_supplies_aed: float
+    output_vat_aed: float
+    total_aed: float
+
+
+class VatReturnOut(BaseModel):
+    business_id: int
+    start: date
+    end: date
+    closed: bool
+    invoice_count: int
+    taxable_supplies_aed: float
+    output_vat_aed: float
+    total_aed: float
+    by_status: List[VatStatusLine] = []
@@ -0,0 +1,78 @@
+import re
+
+from sqlalchemy import Connection, Integer, TextualSelect, text
+from sqlalchemy.orm import Session
+
+
+# Contentless FTS5 indexes kept in sync by triggers, so every write path
+# (ORM, bulk import, raw SQL) updates them. The business column holds a
+# "b<id>" token so a MATCH only walks the postings of one business.
+INDEXES = {
+    "products": ("products_fts", ["name", "sku"]),
+    "customers": ("customers_fts", ["name", "contact", "trn"]),
+}
+
+_TOKEN = re.compile(r"[^\s\"]+")
+
+
+def _ddl(table: str, fts: str, columns: list[str]) -> list[str]:
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"business, {cols}, content='', tokenize=\"unicode61 tokenchars '-_./'\")",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, business, {cols}) VALUES (new.id, 'b' || new.business_id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, business, {cols}) VALUES ('delete', old.id, 'b' || old.business_id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF business_id, {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, business, {cols}) VALUES ('delete', old.id, 'b' || old.business_id, {old}); "
+        f"INSERT INTO {fts}(rowid, business, {cols}) VALUES (new.id, 'b' || new.business_id, {new}); END",
+    ]
+
+
+def install_search_index(conn: Connection) -> None:
+    if conn.dialect.name != "sqlite":
+        return
+    for table, (fts, columns) in INDEXES.items():
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+        ).first()
+        for statement in _ddl(table, fts, columns):
+            conn.exec_driver_sql(statement)
+        if not exists:
+            cols = ", ".join(columns)
+            conn.exec_driver_sql(
+                f"INSERT INTO {fts}(rowid, business, {cols}) SELECT id, 'b' || business_id, {cols} FROM {table}"
+            )
+
+
+def search_enabled(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def match_expression(table: str, business_id: int, q: str) -> str | None:
+    terms = _TOKEN.findall(q)
+    if not terms:
+        return None
+    _, columns = INDEXES[table]
+    prefixes = " AND ".join(f'"{term}"*' for term in terms)
+    return f"business : b{business_id} AND {{{' '.join(columns)}}} : ({prefixes})"
+
+
+def matching_ids(table: str, match: str) -> TextualSelect:
+    fts, _ = INDEXES[table]
+    return text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match").bindparams(match=match).columns(rowid=Integer)
+
+
+def ranked_ids(db: Session, table: str, match: str, limit: int) -> list[int]:
+    fts, columns = INDEXES[table]
+    # The business column only scopes the match, so it carries no weight in the ranking.
+    weights = ", ".join(["0.0"] + ["1.0"] * len(columns))
+    return list(
+        db.scalars(
+            text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :match ORDER BY bm25({fts}, {weights}) LIMIT :limit"),
+            {"match": match, "limit": limit},
+        )
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import InvoiceSequence
+
+
+def reserve_invoice_sequences(db: Session, business_id: int, count: int = 1) -> range:
+    # A single upsert both creates the counter and advances it, so concurrent
+    # terminals are serialized by the row lock instead of racing on COUNT(*).
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        insert(InvoiceSequence)
+        .values(business_id=business_id, last_value=count)
+        .on_conflict_do_update(
+            index_elements=[InvoiceSequence.business_id],
+            set_={"last_value": InvoiceSequence.last_value + count},
+        )
+        .returning(InvoiceSequence.last_value)
+    )
+    last_value = db.execute(stmt).scalar_one()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def next_invoice_sequence(db: Session, business_id: int) -> int:
+    return reserve_invoice_sequences(db, business_id)[0]
@@ -0,0 +1,111 @@
+from collections import Counter
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.orm import Session
+
+from .core.config import settings
+from .models import Product
+from .rollups import UNCOUNTED_STATUSES
+from .versions import bump_versions
+
+
+def held_stock(status: str | None, lines: Iterable) -> Counter:
+    # Units an invoice takes out of stock per product. As with the sales
+    # rollup, drafts and voided invoices hold none.
+    held: Counter = Counter()
+    if status in UNCOUNTED_STATUSES:
+        return held
+    for line in lines:
+        if line.product_id is not None:
+            held[line.product_id] += line.quantity
+    return held
+
+
+def move_stock(db: Session, business_id: int, deltas: dict[int, int]) -> tuple[list, list]:
+    # Applies every delta in one UPDATE. The database applies each decrement to
+    # the current row, so concurrent checkouts of the same SKU never lose one
+    # to a read-modify-write. Returns the rows that moved and, with oversell
+    # rejection on, the ones that were short, in which case nothing moved.
+    delta = case(deltas, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.business_id == business_id, Product.id.in_(deltas))
+        .values(stock_qty=Product.stock_qty - delta)
+        .returning(Product.id, Product.sku)
+        .execution_options(synchronize_session=False)
+    )
+    # Only decrements are guarded; returning stock always succeeds.
+    guarded = settings.stock_reject_oversell and any(qty > 0 for qty in deltas.values())
+    if guarded:
+        stmt = stmt.where(or_(delta <= 0, Product.stock_qty >= delta))
+    moved = db.execute(stmt).all()
+    if not guarded or len(moved) == len(deltas):
+        return moved, []
+
+    # Lines for unknown products never move stock; anything else that was
+    # skipped is short, and the rows that did move are put back.
+    skipped = deltas.keys() - {row.id for row in moved}
+    short = db.execute(
+        select(Product.id, Product.stock_qty).where(Product.business_id == business_id, Product.id.in_(skipped))
+    ).all()
+    if short and moved:
+        db.execute(
+            update(Product)
+            .where(Product.id.in_([row.id for row in moved]))
+            .values(stock_qty=Product.stock_qty + delta)
+            .execution_options(synchronize_session=False)
+        )
+        moved = []
+    return moved, short
+
+
+def shortage(deltas: dict[int, int], short: list) -> str:
+    detail = "; ".join(f"product {p.id}: {deltas[p.id]} requested, {p.stock_qty} in stock" for p in short)
+    return f"Insufficient stock ({detail})"
+
+
+def stock_deltas(before: Counter, after: Counter) -> dict[int, int]:
+    return {pid: after[pid] - before[pid] for pid in before.keys() | after.keys() if after[pid] != before[pid]}
+
+
+def adjust_stock(db: Session, business_id: int, before: Counter, after: Counter) -> list[str | None]:
+    # Moves stock by what an invoice holds after a write minus what it held
+    # before; a short line rolls back the whole write. Returns the SKUs that moved.
+    deltas = stock_deltas(before, after)
+    if not deltas:
+        return []
+    moved, short = move_stock(db, business_id, deltas)
+    if short:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=shortage(deltas, short))
+    if moved:
+        bump_versions(db, business_id, "products")
+    return [row.sku for row in moved]
+
+
+def take_batch_stock(db: Session, business_id: int, holds: list[Counter]) -> tuple[list[str | None], list[str | None]]:
+    # Takes the stock a batch of new invoices holds, in one UPDATE when it all
+    # fits. Otherwise each invoice takes its own in order and the ones that are
+    # short move nothing. Returns the SKUs that moved and an error per invoice.
+    errors: list[str | None] = [None] * len(holds)
+    total: Counter = Counter()
+    for hold in holds:
+        total.update(hold)
+    deltas = stock_deltas(Counter(), total)
+    if not deltas:
+        return [], errors
+    moved, short = move_stock(db, business_id, deltas)
+    if short:
+        for n, hold in enumerate(holds):
+            deltas = stock_deltas(Counter(), hold)
+            if not deltas:
+                continue
+            taken, short = move_stock(db, business_id, deltas)
+            if short:
+                errors[n] = shortage(deltas, short)
+            moved += taken
+    if moved:
+        bump_versions(db, business_id, "products")
+    return [row.sku for row in moved], errors
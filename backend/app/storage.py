@@ -0,0 +1,107 @@
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from PIL import Image, ImageOps
+
+from .core.config import settings
+
+
+CHUNK_SIZE = 1024 * 1024
+# Pre-scaled copies written next to each stored image; renderers load these
+# instead of decoding the full-size original.
+VARIANTS = {"display": (1024, 1024), "thumb": (256, 256)}
+STORED_NAME = re.compile(r"[0-9a-f]{64}(?:\.(?:display|thumb))?\.[a-z0-9]{1,8}")
+_EXTENSION = re.compile(r"\.[a-z0-9]{1,8}")
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    sha256: str
+    name: str
+    path: str
+    size: int
+    created: bool  # False when identical content was already stored
+
+
+def object_path(name: str) -> str:
+    return os.path.join(settings.upload_dir, "objects", name[:2], name)
+
+
+def variant_path(path: str, variant: str) -> str:
+    return f"{os.path.splitext(path)[0]}.{variant}.png"
+
+
+def preferred_image(path: str | None, variant: str = "display") -> str | None:
+    if path:
+        resized = variant_path(path, variant)
+        if os.path.exists(resized):
+            return resized
+    return path
+
+
+def _extension(filename: str | None) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _EXTENSION.fullmatch(ext) else ".bin"
+
+
+def store_stream(source: BinaryIO, filename: str | None, max_bytes: int | None = None) -> StoredFile:
+    max_bytes = settings.upload_max_bytes if max_bytes is None else max_bytes
+    tmp_dir = os.path.join(settings.upload_dir, "tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := source.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = digest.hexdigest() + _extension(filename)
+        path = object_path(name)
+        created = not os.path.exists(path)
+        if created:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return StoredFile(sha256=digest.hexdigest(), name=name, path=path, size=size, created=created)
+
+
+def make_variants(path: str) -> list[str]:
+    targets = {variant: variant_path(path, variant) for variant in VARIANTS}
+    pending = {v: t for v, t in targets.items() if not os.path.exists(t)}
+    if not pending:
+        return list(targets.values())
+    try:
+        with Image.open(path) as source:
+            # JPEG can decode straight at a reduced scale when only smaller copies are needed.
+            source.draft("RGB", max(VARIANTS.values()))
+            image = ImageOps.exif_transpose(source)
+            image.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return []  # not an image we can read; the original is still served as-is
+
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+    for variant, target in pending.items():
+        resized = image.copy()
+        resized.thumbnail(VARIANTS[variant], Image.LANCZOS)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".png")
+        with os.fdopen(fd, "wb") as out:
+            resized.save(out, "PNG")
+        os.replace(tmp, target)
+    return list(targets.values())
@@ -1,18 +1,20 @@
 from datetime import datetime
+from decimal import Decimal
+
+from .money import to_aed, to_fils, vat_fils
 
 
 AED_SYMBOL = "AED"
-VAT_RATE = 0.05
 
 
-def generate_invoice_number(sequence: int) -> str:
-    return f"INV-{sequence:05d}"
+def generate_invoice_number(business_id: int, sequence: int) -> str:
+    return f"INV-{business_id}-{sequence:05d}"
 
 
-def calculate_totals(subtotal: float) -> tuple[float, float, float]:
-    vat = round(subtotal * VAT_RATE, 2)
-    total = round(subtotal + vat, 2)
-    return round(subtotal, 2), vat, total
+def calculate_totals(subtotal: Decimal | float) -> tuple[Decimal, Decimal, Decimal]:
+    fils = to_fils(subtotal)
+    vat = vat_fils(fils)
+    return to_aed(fils), to_aed(vat), to_aed(fils + vat)
 
 
 def utcnow_str() -> str:
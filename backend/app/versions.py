@@ -0,0 +1,53 @@
+import time
+from typing import Iterable
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from .models import DataVersion
+from .responses import etag_matches
+
+
+def bump_versions(db: Session, business_id: int, *resources: str) -> None:
+    # Runs inside the write's transaction so the new version commits with the data.
+    # A counter starts at the current time in ms rather than 1, so a recreated
+    # database does not hand out ETags that clients still hold from the old one.
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    for resource in resources:
+        stmt = (
+            insert(DataVersion)
+            .values(business_id=business_id, resource=resource, version=time.time_ns() // 1_000_000)
+            .on_conflict_do_update(
+                index_elements=[DataVersion.business_id, DataVersion.resource],
+                set_={"version": DataVersion.version + 1},
+            )
+        )
+        db.execute(stmt)
+
+
+def bump_businesses(db: Session, business_ids: Iterable[int], *resources: str) -> None:
+    for business_id in set(business_ids):
+        bump_versions(db, business_id, *resources)
+
+
+def current_version(db: Session, business_id: int, resource: str) -> int:
+    version = db.scalar(
+        select(DataVersion.version).where(DataVersion.business_id == business_id, DataVersion.resource == resource)
+    )
+    return version or 0
+
+
+def listing_etag(db: Session, business_id: int, resource: str, representation: str = "") -> str:
+    suffix = f"-{representation}" if representation else ""
+    return f'W/"{resource}-{business_id}-{current_version(db, business_id, resource)}{suffix}"'
+
+
+def check_etag(request: Request, response: Response, etag: str) -> None:
+    # Pollers revalidate on every request; an unchanged version answers 304
+    # without querying or serializing the listing.
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
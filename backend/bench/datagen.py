@@ -0,0 +1,210 @@
+import argparse
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import accumulate
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models import Business, Customer, Invoice, InvoiceItem, Product
+from app.money import invoice_totals
+from app.rollups import rebuild_daily_sales
+from app.sequences import reserve_invoice_sequences
+from app.utils import generate_invoice_number
+
+
+@dataclass(frozen=True)
+class DataSize:
+    businesses: int
+    products: int  # per business
+    customers: int  # per business
+    invoices: int  # across all businesses
+    days: int = 365
+
+
+SIZES = {
+    "small": DataSize(businesses=5, products=200, customers=100, invoices=2_000),
+    "medium": DataSize(businesses=20, products=2_000, customers=1_000, invoices=50_000),
+    "large": DataSize(businesses=50, products=5_000, customers=5_000, invoices=1_000_000, days=730),
+}
+
+CHUNK = 5_000
+# Business activity, product popularity and customer loyalty all follow a
+# Zipf-like curve: a few hot tenants and best sellers carry most of the traffic.
+SKEW = 1.1
+WALK_IN_SHARE = 0.3
+STATUSES = {"paid": 60, "unpaid": 28, "overdue": 6, "draft": 4, "void": 2}
+ITEMS_PER_INVOICE = {1: 30, 2: 25, 3: 18, 4: 12, 5: 8, 8: 5, 15: 2}
+
+ADJECTIVES = ["fresh", "organic", "premium", "classic", "spicy", "frozen", "golden", "royal", "desert", "family"]
+NOUNS = ["dates", "saffron", "karak", "shawarma", "biryani", "hummus", "labneh", "falafel", "oud", "kunafa"]
+FIRST_NAMES = ["Ahmed", "Fatima", "Omar", "Aisha", "Rahul", "Priya", "Maria", "John", "Layla", "Yusuf"]
+LAST_NAMES = ["Al Mansoori", "Khan", "Nair", "Haddad", "Santos", "Smith", "Al Falasi", "Iyer", "Saleh", "Costa"]
+
+
+@dataclass
+class Dataset:
+    # Business ids from hottest to coldest; benchmarks pick tenants with the same weights.
+    business_ids: list[int]
+    weights: list[float]
+    skus: dict[int, list[str]] = field(default_factory=dict)
+    invoices: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+    def pick_business(self, rng: random.Random) -> int:
+        return rng.choices(self.business_ids, cum_weights=self.weights)[0]
+
+    def pick_sku(self, rng: random.Random, business_id: int) -> str:
+        skus = self.skus[business_id]
+        return skus[min(int(rng.paretovariate(SKEW)) - 1, len(skus) - 1)]
+
+
+def zipf_cum_weights(n: int) -> list[float]:
+    return list(accumulate(1 / rank**SKEW for rank in range(1, n + 1)))
+
+
+def next_id(db: Session, column) -> int:
+    return (db.scalar(select(func.max(column))) or 0) + 1
+
+
+def generate(db: Session, size: DataSize, seed: int = 0) -> Dataset:
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    today = date.today()
+
+    business_id = next_id(db, Business.id)
+    business_ids = list(range(business_id, business_id + size.businesses))
+    db.execute(
+        insert(Business),
+        [{"id": bid, "name": f"Bench Store {bid}", "trn": f"100{bid:012d}"} for bid in business_ids],
+    )
+
+    product_id = next_id(db, Product.id)
+    customer_id = next_id(db, Customer.id)
+    catalog: dict[int, list[tuple[int, str, float]]] = {}
+    clientele: dict[int, list[int]] = {}
+    skus: dict[int, list[str]] = {}
+    for bid in business_ids:
+        products = []
+        for n in range(size.products):
+            price = round(min(rng.lognormvariate(3, 1), 5_000), 2) or 1.0
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {n}"
+            products.append(
+                {
+                    "id": product_id + n,
+                    "business_id": bid,
+                    "name": name,
+                    "sku": f"SKU-{bid}-{n:06d}",
+                    "price_aed": price,
+                    "stock_qty": rng.randint(0, 500),
+                }
+            )
+        db.execute(insert(Product), products)
+        catalog[bid] = [(p["id"], p["name"], p["price_aed"]) for p in products]
+        skus[bid] = [p["sku"] for p in products]
+        product_id += size.products
+
+        customers = [
+            {
+                "id": customer_id + n,
+                "business_id": bid,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "contact": f"+9715{rng.randint(0, 99_999_999):08d}",
+                "trn": f"{rng.randint(0, 10**15 - 1):015d}" if rng.random() < 0.2 else None,
+            }
+            for n in range(size.customers)
+        ]
+        db.execute(insert(Customer), customers)
+        clientele[bid] = [c["id"] for c in customers]
+        customer_id += size.customers
+
+    business_weights = zipf_cum_weights(size.businesses)
+    product_weights = zipf_cum_weights(size.products)
+    customer_weights = zipf_cum_weights(size.customers)
+    statuses, status_weights = list(STATUSES), list(accumulate(STATUSES.values()))
+    line_counts, line_weights = list(ITEMS_PER_INVOICE), list(accumulate(ITEMS_PER_INVOICE.values()))
+
+    owners = rng.choices(business_ids, cum_weights=business_weights, k=size.invoices)
+    sequences = {bid: iter(reserve_invoice_sequences(db, bid, count)) for bid, count in Counter(owners).items()}
+
+    invoice_id = next_id(db, Invoice.id)
+    items = 0
+    for start in range(0, size.invoices, CHUNK):
+        invoice_rows, item_rows = [], []
+        for bid in owners[start : start + CHUNK]:
+            lines = rng.choices(catalog[bid], cum_weights=product_weights, k=rng.choices(line_counts, line_weights)[0])
+            quantities = [rng.randint(1, 5) for _ in lines]
+            totals = invoice_totals((price, quantity) for (_, _, price), quantity in zip(lines, quantities))
+            for n, ((pid, name, price), quantity) in enumerate(zip(lines, quantities)):
+                item_rows.append(
+                    {
+                        "invoice_id": invoice_id,
+                        "product_id": pid,
+                        "description": name,
+                        "quantity": quantity,
+                        "unit_price_aed": price,
+                        "line_total_aed": totals.line_aed(n),
+                    }
+                )
+            subtotal_aed, vat_aed, total_aed = totals.aed()
+            day = today - timedelta(days=rng.randrange(size.days))
+            walk_in = rng.random() < WALK_IN_SHARE
+            invoice_rows.append(
+                {
+                    "id": invoice_id,
+                    "business_id": bid,
+                    "customer_id": None if walk_in else rng.choices(clientele[bid], cum_weights=customer_weights)[0],
+                    "number": generate_invoice_number(bid, next(sequences[bid])),
+                    "date": day,
+                    "due_date": day + timedelta(days=30),
+                    "subtotal_aed": subtotal_aed,
+                    "vat_aed": vat_aed,
+                    "total_aed": total_aed,
+                    "status": rng.choices(statuses, cum_weights=status_weights)[0],
+                }
+            )
+            invoice_id += 1
+        db.execute(insert(Invoice), invoice_rows)
+        db.execute(insert(InvoiceItem), item_rows)
+        items += len(item_rows)
+        db.commit()
+
+    rebuild_daily_sales(db)
+    db.commit()
+    return Dataset(
+        business_ids=business_ids,
+        weights=business_weights,
+        skus=skus,
+        invoices=size.invoices,
+        items=items,
+        seconds=time.perf_counter() - started,
+    )
+
+
+def main() -> None:
+    import app.main  # noqa: F401  creates the schema and search index
+
+    from app.db import SessionLocal
+
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.datagen",
+        description="Fill the database at DATABASE_URL with synthetic businesses, products, customers and invoices",
+    )
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        dataset = generate(db, SIZES[args.size], args.seed)
+    print(
+        f"{len(dataset.business_ids)} businesses, {dataset.invoices} invoices, "
+        f"{dataset.items} items in {dataset.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+
+def legacy_totals(invoice, vat_rate: float) -> tuple[list[float], tuple[float, float, float]]:
+    # The float path money.py replaced: round() after every step.
+    lines = [round(float(i.unit_price_aed) * int(i.quantity), 2) for i in invoice.items]
+    subtotal = round(sum(lines), 2)
+    vat = round(subtotal * vat_rate, 2)
+    return lines, (subtotal, vat, round(subtotal + vat, 2))
+
+
+def per_invoice(db, basis_points: int, legacy: bool = False) -> int:
+    # Loads every invoice and its items through the ORM and writes the totals
+    # back object by object, with either the legacy float math or money.py.
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.models import Invoice
+    from app.money import BASIS_POINTS, invoice_totals
+    from app.rollups import rebuild_daily_sales
+
+    changed = 0
+    stmt = select(Invoice).options(selectinload(Invoice.items)).execution_options(yield_per=1000)
+    for batch in db.scalars(stmt).partitions():
+        for invoice in batch:
+            if legacy:
+                lines, amounts = legacy_totals(invoice, basis_points / BASIS_POINTS)
+            else:
+                totals = invoice_totals(((i.unit_price_aed, i.quantity) for i in invoice.items), basis_points)
+                lines = [totals.line_aed(n) for n in range(len(totals.lines))]
+                amounts = totals.aed()
+            for item, line_total in zip(invoice.items, lines):
+                item.line_total_aed = line_total
+            stored = (invoice.subtotal_aed, invoice.vat_aed, invoice.total_aed)
+            if stored != tuple(Decimal(str(a)) for a in amounts):
+                changed += 1
+            invoice.subtotal_aed, invoice.vat_aed, invoice.total_aed = amounts
+        db.flush()
+    rebuild_daily_sales(db)
+    db.commit()
+    return changed
+
+
+def set_based(db, basis_points: int) -> int:
+    from app.recompute import recompute_totals
+
+    return recompute_totals(db, basis_points=basis_points).invoices
+
+
+def snapshot(path: str) -> list[tuple]:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT id, subtotal_aed, vat_aed, total_aed FROM invoices ORDER BY id").fetchall()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.recompute", description="Bulk invoice total recompute: per-invoice ORM vs set-based SQL"
+    )
+    parser.add_argument("--size", default="medium", help="data size from bench.datagen.SIZES")
+    parser.add_argument("--vat-rate", type=Decimal, default=Decimal("0.06"), help="rate to recompute with")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # As in bench.run, the app binds its engine at import, so the environment comes first.
+    workdir = tempfile.mkdtemp(prefix="bench-recompute-")
+    base = f"{workdir}/base.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{base}"
+    os.environ["UPLOAD_DIR"] = f"{workdir}/uploads"
+
+    import app.main  # noqa: F401  creates the schema
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import SessionLocal, create_db_engine, engine
+    from app.money import BASIS_POINTS
+    from bench.datagen import SIZES, generate
+
+    with SessionLocal() as db:
+        dataset = generate(db, SIZES[args.size], args.seed)
+    engine.dispose()
+    basis_points = int(args.vat_rate * BASIS_POINTS)
+
+    methods = {
+        "legacy_float_per_invoice": lambda db: per_invoice(db, basis_points, legacy=True),
+        "fils_per_invoice": lambda db: per_invoice(db, basis_points),
+        "fils_set_based": lambda db: set_based(db, basis_points),
+    }
+    results = {}
+    finals = {}
+    for name, method in methods.items():
+        copy = f"{workdir}/{name}.db"
+        with sqlite3.connect(base) as source, sqlite3.connect(copy) as target:
+            source.backup(target)
+        copy_engine = create_db_engine(f"sqlite:///{copy}", 1)
+        with sessionmaker(bind=copy_engine)() as db:
+            started = time.perf_counter()
+            changed = method(db)
+            seconds = time.perf_counter() - started
+        copy_engine.dispose()
+        finals[name] = snapshot(copy)
+        results[name] = {
+            "seconds": round(seconds, 3),
+            "invoices_per_s": round(dataset.invoices / seconds, 1),
+            "changed": changed,
+        }
+        print(f"  {name:26} {seconds:8.2f} s  {results[name]['invoices_per_s']:10.0f} invoices/s", file=sys.stderr)
+
+    report = {
+        "invoices": dataset.invoices,
+        "items": dataset.items,
+        "vat_rate": str(args.vat_rate),
+        "methods": results,
+        # Both fils paths must land on identical amounts; the float path may not.
+        "fils_paths_agree": finals["fils_per_invoice"] == finals["fils_set_based"],
+        "legacy_float_differs": sum(
+            a != b for a, b in zip(finals["legacy_float_per_invoice"], finals["fils_set_based"])
+        ),
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,625 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+WARMUP = 3
+BACKGROUND_WORKERS = 4
+# The endpoints with DB_ASYNC twins, weighted like a busy till-and-dashboard day.
+CLIENT_MIX = (("invoices.list", 35), ("products.list", 25), ("customers.list", 20), ("invoices.create", 20))
+
+
+@dataclass
+class Scenario:
+    name: str
+    call: Callable  # (client, rng) -> response
+    units: int | Callable = 1  # records per request (or response -> count), so batch and single paths compare
+    share: float = 1.0  # fraction of --iterations for endpoints that are expensive by design
+    setup: Callable | None = None  # (client, rng, n) -> None, run before timing
+    background: Callable | None = None  # (client, rng) -> response, looped while the scenario is timed
+
+
+def percentile(ordered: list[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def measure(client, scenario: Scenario, iterations: int, concurrency: int, seed: int) -> dict:
+    n = max(5, int(iterations * scenario.share))
+    rng = random.Random(seed)
+    if scenario.setup:
+        scenario.setup(client, rng, n + WARMUP)
+
+    def timed(_) -> tuple[float, int, int]:
+        started = time.perf_counter()
+        response = scenario.call(client, rng)
+        elapsed = time.perf_counter() - started
+        units = scenario.units(response) if callable(scenario.units) else scenario.units
+        return elapsed, response.status_code, units
+
+    stop = threading.Event()
+    background = []
+    if scenario.background:
+
+        def loop() -> None:
+            while not stop.is_set():
+                scenario.background(client, rng)
+
+        background = [threading.Thread(target=loop, daemon=True) for _ in range(BACKGROUND_WORKERS)]
+        for thread in background:
+            thread.start()
+
+    try:
+        for _ in range(WARMUP):
+            timed(None)
+        started = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(concurrency) as pool:
+                samples = list(pool.map(timed, range(n)))
+        else:
+            samples = [timed(i) for i in range(n)]
+        wall = time.perf_counter() - started
+    finally:
+        stop.set()
+        for thread in background:
+            thread.join()
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    units = sum(s[2] for s in samples)
+    return {
+        "requests": n,
+        "units": units,
+        "errors": sum(1 for _, status, _ in samples if status >= 400),
+        "seconds": round(wall, 4),
+        "throughput_rps": round(n / wall, 2),
+        "units_per_s": round(units / wall, 2),
+        "mean_ms": round(sum(latencies) / n, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(latencies[-1], 3),
+    }
+
+
+def build_scenarios(dataset) -> list[Scenario]:
+    from bench.datagen import ADJECTIVES, FIRST_NAMES, NOUNS
+
+    hot, cold = dataset.business_ids[0], dataset.business_ids[-1]
+    today = date.today()
+    quarter_end = date(today.year, 3 * ((today.month - 1) // 3) + 1, 1) - timedelta(days=1)
+    quarter_start = date(quarter_end.year, quarter_end.month - 2, 1)
+    created: list[int] = []
+    doomed: list[int] = []
+    password = "bench-password"
+
+    def invoice_payload(rng: random.Random, business_id: int, lines: int = 3) -> dict:
+        return {
+            "business_id": business_id,
+            "due_date": None,
+            "items": [
+                {
+                    "description": "bench item",
+                    "quantity": rng.randint(1, 5),
+                    "unit_price_aed": round(rng.uniform(1, 200), 2),
+                }
+                for _ in range(lines)
+            ],
+        }
+
+    def list_products(client, rng):
+        return client.get("/api/products/", params={"business_id": dataset.pick_business(rng), "limit": 50})
+
+    def product_by_sku(client, rng):
+        business_id = dataset.pick_business(rng)
+        sku = dataset.pick_sku(rng, business_id)
+        return client.get(f"/api/products/by-sku/{sku}", params={"business_id": business_id})
+
+    def search_products(client, rng):
+        return client.get("/api/products/search", params={"business_id": hot, "q": rng.choice(NOUNS)[:4]})
+
+    def list_invoices(client, rng):
+        return client.get("/api/invoices/", params={"business_id": dataset.pick_business(rng), "limit": 50})
+
+    def create_invoice(client, rng):
+        response = client.post("/api/invoices/", json=invoice_payload(rng, dataset.pick_business(rng)))
+        if response.status_code == 200:
+            created.append(response.json()["id"])
+        return response
+
+    def vat_return(client, rng):
+        params = {"business_id": dataset.pick_business(rng), "start": quarter_start, "end": quarter_end}
+        return client.get("/api/reports/vat-return", params=params)
+
+    def deep_pages(client, rng):
+        params = {"business_id": hot, "limit": 50}
+        for _ in range(10):
+            response = client.get("/api/invoices/", params=params)
+            params["after"] = response.json()["next_cursor"]
+            if not params["after"]:
+                break
+        return response
+
+    def sales_report(client, rng):
+        params = {
+            "business_id": dataset.pick_business(rng),
+            "start": today - timedelta(days=365),
+            "end": today,
+            "granularity": "month",
+        }
+        return client.get("/api/reports/sales", params=params)
+
+    def seed_updates(client, rng, n):
+        if not created:
+            payload = {"invoices": [invoice_payload(rng, hot) for _ in range(min(500, n))]}
+            created.extend(r["id"] for r in client.post("/api/invoices/batch", json=payload).json()["results"])
+
+    def update_invoice(client, rng):
+        invoice_id = rng.choice(created)
+        return client.put(f"/api/invoices/{invoice_id}", json=invoice_payload(rng, hot, rng.randint(1, 6)))
+
+    def fill_doomed(client, rng, n):
+        while len(doomed) < n:
+            payload = {"invoices": [invoice_payload(rng, cold) for _ in range(min(500, n - len(doomed)))]}
+            doomed.extend(r["id"] for r in client.post("/api/invoices/batch", json=payload).json()["results"])
+
+    def import_products(client, rng):
+        rows = ["name,sku,price_aed,stock_qty"]
+        for n in range(200):
+            price = round(rng.uniform(1, 100), 2)
+            rows.append(f"imported {n},{dataset.pick_sku(rng, hot)},{price},{rng.randint(0, 50)}")
+        files = {"file": ("products.csv", "\n".join(rows).encode(), "text/csv")}
+        return client.post("/api/import/products.csv", params={"business_id": hot}, files=files)
+
+    # Terminals keep the last ETag per listing and revalidate with If-None-Match.
+    etags: dict[tuple[str, int], str] = {}
+
+    def poller(path: str) -> Callable:
+        def poll(client, rng):
+            business_id = dataset.pick_business(rng)
+            etag = etags.get((path, business_id))
+            headers = {"If-None-Match": etag} if etag else {}
+            response = client.get(path, params={"business_id": business_id, "limit": 50}, headers=headers)
+            if "etag" in response.headers:
+                etags[(path, business_id)] = response.headers["etag"]
+            return response
+
+        return poll
+
+    def register(client, rng, n):
+        client.post("/api/auth/register", json={"email": "bench@example.com", "password": password})
+
+    def login(client, rng):
+        return client.post("/api/auth/token", data={"username": "bench@example.com", "password": password})
+
+    tokens: list[str] = []
+
+    def authenticate(client, rng, n):
+        register(client, rng, n)
+        if not tokens:
+            tokens.append(login(client, rng).json()["access_token"])
+
+    def me(client, rng):
+        return client.get("/api/auth/me", headers={"Authorization": f"Bearer {tokens[0]}"})
+
+    def me_uncached(client, rng):
+        # The path every request took before token_cache: JWT verify plus a users lookup.
+        from app.routers.auth import token_cache
+
+        token_cache.clear()
+        return me(client, rng)
+
+    mix = [
+        (list_products, 25),
+        (product_by_sku, 30),
+        (search_products, 10),
+        (list_invoices, 15),
+        (vat_return, 5),
+        (create_invoice, 15),
+    ]
+
+    def mixed(client, rng):
+        return rng.choices([call for call, _ in mix], weights=[weight for _, weight in mix])[0](client, rng)
+
+    return [
+        Scenario("health", lambda c, rng: c.get("/health")),
+        Scenario("businesses.list", lambda c, rng: c.get("/api/businesses/")),
+        Scenario("products.list", list_products),
+        Scenario(
+            "products.list_filtered",
+            lambda c, rng: c.get("/api/products/", params={"business_id": hot, "q": rng.choice(ADJECTIVES)}),
+        ),
+        Scenario("products.search", search_products),
+        Scenario("products.by_sku", product_by_sku),
+        Scenario(
+            "customers.list",
+            lambda c, rng: c.get("/api/customers/", params={"business_id": dataset.pick_business(rng)}),
+        ),
+        Scenario(
+            "customers.search",
+            lambda c, rng: c.get("/api/customers/search", params={"business_id": hot, "q": rng.choice(FIRST_NAMES)}),
+        ),
+        Scenario("invoices.list", list_invoices),
+        Scenario(
+            "invoices.list_filtered",
+            lambda c, rng: c.get(
+                "/api/invoices/",
+                params={"business_id": hot, "status": "paid", "start": quarter_start, "end": quarter_end},
+            ),
+        ),
+        Scenario("invoices.list_deep", deep_pages, units=10, share=0.2),
+        Scenario("invoices.create", create_invoice),
+        Scenario(
+            "invoices.batch",
+            lambda c, rng: c.post(
+                "/api/invoices/batch", json={"invoices": [invoice_payload(rng, hot) for _ in range(50)]}
+            ),
+            units=50,
+            share=0.2,
+        ),
+        Scenario("invoices.update", update_invoice, setup=seed_updates),
+        Scenario(
+            "invoices.patch_notes",
+            lambda c, rng: c.patch(f"/api/invoices/{rng.choice(created)}", json={"notes": f"note {rng.random()}"}),
+            setup=seed_updates,
+        ),
+        Scenario("invoices.delete", lambda c, rng: c.delete(f"/api/invoices/{doomed.pop()}"), setup=fill_doomed),
+        Scenario("reports.sales", sales_report),
+        Scenario("reports.vat_return", vat_return),
+        Scenario(
+            "reports.vat_return_open",
+            lambda c, rng: c.get(
+                "/api/reports/vat-return",
+                params={"business_id": hot, "start": today - timedelta(days=90), "end": today},
+            ),
+        ),
+        Scenario(
+            "export.invoices_csv",
+            lambda c, rng: c.get("/api/export/invoices.csv", params={"business_id": cold}),
+            share=0.1,
+        ),
+        Scenario(
+            "export.invoices_csv_gzip",
+            lambda c, rng: c.get("/api/export/invoices.csv", params={"business_id": cold, "gzip": True}),
+            share=0.1,
+        ),
+        Scenario("import.products_csv", import_products, units=200, share=0.1),
+        Scenario(
+            "documents.invoice_pdf",
+            lambda c, rng: c.get(f"/api/documents/invoices/{rng.choice(created)}.pdf"),
+            setup=seed_updates,
+        ),
+        Scenario(
+            "documents.receipt_png",
+            lambda c, rng: c.get(f"/api/documents/invoices/{rng.choice(created)}/receipt.png"),
+            setup=seed_updates,
+        ),
+        Scenario(
+            "documents.invoices_zip",
+            lambda c, rng: c.get(
+                "/api/documents/invoices.zip",
+                params={"business_id": cold, "start": today - timedelta(days=7), "end": today},
+            ),
+            units=lambda response: int(response.headers.get("x-rendered-pages", 0)),
+            share=0.02,
+        ),
+        Scenario("polling.products", poller("/api/products/")),
+        Scenario("polling.customers", poller("/api/customers/")),
+        Scenario("polling.invoices", poller("/api/invoices/")),
+        Scenario("polling.invoices_during_checkout", poller("/api/invoices/"), background=create_invoice, share=0.2),
+        Scenario("auth.login", login, share=0.05, setup=register),
+        Scenario("auth.me", me, setup=authenticate),
+        Scenario("auth.me_uncached", me_uncached, setup=authenticate),
+        Scenario("checkout.during_login_storm", create_invoice, background=login, share=0.2),
+        Scenario("mixed", mixed),
+    ]
+
+
+def prepare(args: argparse.Namespace):
+    # Settings and engines are bound when app is imported, so every data size
+    # gets a fresh process pointed at its own temporary database.
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["UPLOAD_DIR"] = f"{workdir}/uploads"
+    os.environ["DB_ASYNC"] = "true" if args.async_db else "false"
+
+    from app.db import SessionLocal
+    from app.main import app
+    from bench.datagen import SIZES, generate
+
+    if args.size not in SIZES:
+        raise SystemExit(f"unknown size {args.size!r}, expected one of {', '.join(SIZES)}")
+    with SessionLocal() as db:
+        dataset = generate(db, SIZES[args.size], args.seed)
+    return app, dataset
+
+
+def worker(args: argparse.Namespace) -> None:
+    from fastapi.testclient import TestClient
+
+    app, dataset = prepare(args)
+    only = set(args.scenario or [])
+    scenarios = [s for s in build_scenarios(dataset) if not only or s.name in only]
+    results = {}
+    with TestClient(app) as client:
+        for n, scenario in enumerate(scenarios):
+            results[scenario.name] = measure(client, scenario, args.iterations, args.concurrency, args.seed + n)
+            print(f"  {args.size:8} {scenario.name:32} p95 {results[scenario.name]['p95_ms']:9.2f} ms", file=sys.stderr)
+
+    report = {
+        "dataset": {
+            "businesses": len(dataset.business_ids),
+            "invoices": dataset.invoices,
+            "items": dataset.items,
+            "generate_seconds": round(dataset.seconds, 2),
+        },
+        "scenarios": results,
+    }
+    Path(args.out).write_text(json.dumps(report))
+
+
+async def client_load(app, dataset, clients: int, requests: int, seed: int) -> dict:
+    # Many concurrent clients on one event loop, talking to the app in-process.
+    # Sync endpoints queue for anyio's worker threads (40 by default); the
+    # DB_ASYNC twins do not, which is what this mode compares.
+    import asyncio
+
+    import httpx
+
+    rng = random.Random(seed)
+    kinds = rng.choices([k for k, _ in CLIENT_MIX], weights=[w for _, w in CLIENT_MIX], k=requests)
+    pending = iter(kinds)
+    samples: list[tuple[str, float, int]] = []
+
+    def request(kind: str) -> tuple[str, str, dict]:
+        business_id = dataset.pick_business(rng)
+        if kind == "invoices.create":
+            items = [
+                {
+                    "description": "bench item",
+                    "quantity": rng.randint(1, 5),
+                    "unit_price_aed": rng.randint(100, 20_000) / 100,
+                }
+                for _ in range(3)
+            ]
+            return "POST", "/api/invoices/", {"json": {"business_id": business_id, "items": items}}
+        return "GET", f"/api/{kind.split('.')[0]}/", {"params": {"business_id": business_id, "limit": 50}}
+
+    async def client(http) -> None:
+        # Each client sends its next request as soon as the previous one is answered.
+        for kind in pending:
+            method, url, options = request(kind)
+            started = time.perf_counter()
+            response = await http.request(method, url, **options)
+            samples.append((kind, time.perf_counter() - started, response.status_code))
+
+    # ASGITransport skips the lifespan, whose shutdown disposes the async
+    # engines; their aiosqlite threads would otherwise keep the worker alive.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench", timeout=None
+    ) as http:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        wall = time.perf_counter() - started
+
+    def summary(rows: list[tuple[str, float, int]]) -> dict:
+        latencies = sorted(s[1] * 1000 for s in rows)
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, _, status in rows if status >= 400),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+        }
+
+    return {
+        "seconds": round(wall, 4),
+        "throughput_rps": round(len(samples) / wall, 2),
+        **summary(samples),
+        "endpoints": {kind: summary([s for s in samples if s[0] == kind]) for kind, _ in CLIENT_MIX},
+    }
+
+
+def clients_worker(args: argparse.Namespace) -> None:
+    import asyncio
+
+    # Hundreds of writers queue on one SQLite file; lock waits must not turn into errors.
+    os.environ["SQLITE_BUSY_TIMEOUT_MS"] = "60000"
+    # One connection per client. A sync request's session is only closed by its
+    # dependency teardown, which queues for a worker thread like new requests
+    # do; a smaller pool lets those requests hold every thread waiting on
+    # connections that the teardowns behind them would return.
+    os.environ["DB_POOL_SIZE"] = os.environ["DB_READ_POOL_SIZE"] = str(args.clients)
+    app, dataset = prepare(args)
+    result = asyncio.run(client_load(app, dataset, args.clients, args.iterations, args.seed))
+    Path(args.out).write_text(json.dumps(result))
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> None:
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "async_db": args.async_db,
+            "seed": args.seed,
+        },
+        "sizes": {},
+    }
+    for size in args.sizes:
+        with tempfile.NamedTemporaryFile(suffix=".json") as part:
+            command = [
+                sys.executable, "-m", "bench.run", "worker",
+                "--size", size,
+                "--out", part.name,
+                "--iterations", str(args.iterations),
+                "--concurrency", str(args.concurrency),
+                "--seed", str(args.seed),
+            ]
+            command += ["--async-db"] if args.async_db else []
+            for name in args.scenario or []:
+                command += ["--scenario", name]
+            subprocess.run(command, cwd=BACKEND_DIR, check=True)
+            report["sizes"][size] = json.loads(Path(part.name).read_text())
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+
+def clients(args: argparse.Namespace) -> None:
+    # The same request mix at --clients concurrent clients, once per database mode.
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "size": args.size,
+            "clients": args.clients,
+            "requests": args.iterations,
+            "mix": dict(CLIENT_MIX),
+            "seed": args.seed,
+        },
+        "modes": {},
+    }
+    for mode in ("sync", "async"):
+        with tempfile.NamedTemporaryFile(suffix=".json") as part:
+            command = [
+                sys.executable, "-m", "bench.run", "clients-worker",
+                "--size", args.size,
+                "--out", part.name,
+                "--clients", str(args.clients),
+                "--iterations", str(args.iterations),
+                "--seed", str(args.seed),
+            ]
+            command += ["--async-db"] if mode == "async" else []
+            subprocess.run(command, cwd=BACKEND_DIR, check=True)
+            result = report["modes"][mode] = json.loads(Path(part.name).read_text())
+        print(
+            f"  {mode:6} {args.clients} clients  {result['throughput_rps']:9.1f} rps  "
+            f"p95 {result['p95_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  errors {result['errors']}",
+            file=sys.stderr,
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+
+def compare(args: argparse.Namespace) -> None:
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    regressions = 0
+    for size, current in new["sizes"].items():
+        previous = base["sizes"].get(size, {}).get("scenarios", {})
+        for name, after in current["scenarios"].items():
+            before = previous.get(name)
+            if not before:
+                continue
+            slower = (
+                after["p95_ms"] - before["p95_ms"] > args.min_ms
+                and after["p95_ms"] > before["p95_ms"] * (1 + args.threshold)
+            )
+            weaker = after["throughput_rps"] < before["throughput_rps"] * (1 - args.threshold)
+            flag = "REGRESSION" if slower or weaker else ""
+            regressions += bool(flag)
+            print(
+                f"{size:8} {name:32} p95 {before['p95_ms']:9.2f} -> {after['p95_ms']:9.2f} ms  "
+                f"rps {before['throughput_rps']:9.1f} -> {after['throughput_rps']:9.1f}  {flag}"
+            )
+    if regressions:
+        print(f"{regressions} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+def main() -> None:
+    # app is only imported inside worker processes, after their environment is set.
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="In-process API benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--iterations", type=int, default=200, help="requests per scenario")
+        p.add_argument("--concurrency", type=int, default=1, help="client threads issuing requests")
+        p.add_argument("--async-db", action="store_true", help="serve the hot endpoints through DB_ASYNC")
+        p.add_argument("--seed", type=int, default=0)
+        p.add_argument("--scenario", action="append", help="only run the named scenario (repeatable)")
+
+    run_parser = commands.add_parser("run", help="generate data and benchmark every endpoint")
+    run_parser.add_argument(
+        "--sizes", nargs="+", default=["small", "medium"], help="data sizes from bench.datagen.SIZES"
+    )
+    run_parser.add_argument("--out", help="write JSON here instead of stdout")
+    add_run_options(run_parser)
+    run_parser.set_defaults(handler=run)
+
+    worker_parser = commands.add_parser("worker")
+    worker_parser.add_argument("--size", required=True)
+    worker_parser.add_argument("--out", required=True)
+    add_run_options(worker_parser)
+    worker_parser.set_defaults(handler=worker)
+
+    def add_clients_options(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--size", default="small", help="data size from bench.datagen.SIZES")
+        p.add_argument("--clients", type=int, default=512, help="concurrent clients")
+        p.add_argument("--iterations", type=int, default=5_000, help="requests across all clients")
+        p.add_argument("--seed", type=int, default=0)
+
+    clients_parser = commands.add_parser("clients", help="sync vs DB_ASYNC endpoints under many concurrent clients")
+    clients_parser.add_argument("--out", help="write JSON here instead of stdout")
+    add_clients_options(clients_parser)
+    clients_parser.set_defaults(handler=clients)
+
+    clients_worker_parser = commands.add_parser("clients-worker")
+    clients_worker_parser.add_argument("--out", required=True)
+    clients_worker_parser.add_argument("--async-db", action="store_true")
+    add_clients_options(clients_worker_parser)
+    clients_worker_parser.set_defaults(handler=clients_worker)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative change treated as a regression")
+    compare_parser.add_argument("--min-ms", type=float, default=0.5, help="ignore p95 changes smaller than this")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+
+def build_invoices(count: int, seed: int) -> list:
+    from app.models import Invoice, InvoiceItem
+    from bench.datagen import ITEMS_PER_INVOICE, NOUNS, STATUSES
+
+    rng = random.Random(seed)
+    today = date.today()
+    invoices = []
+    for n in range(1, count + 1):
+        lines = rng.choices(list(ITEMS_PER_INVOICE), weights=list(ITEMS_PER_INVOICE.values()))[0]
+        items = []
+        for m in range(lines):
+            price = Decimal(rng.randint(100, 20_000)) / 100
+            quantity = rng.randint(1, 5)
+            items.append(
+                InvoiceItem(
+                    id=n * 100 + m,
+                    product_id=rng.randint(1, 2_000),
+                    description=f"{rng.choice(NOUNS)} {m}",
+                    quantity=quantity,
+                    unit_price_aed=price,
+                    line_total_aed=price * quantity,
+                )
+            )
+        subtotal = sum(i.line_total_aed for i in items)
+        invoices.append(
+            Invoice(
+                id=n,
+                business_id=1,
+                customer_id=rng.choice([None, rng.randint(1, 1_000)]),
+                number=f"INV-1-{n:05d}",
+                date=today - timedelta(days=rng.randint(0, 365)),
+                due_date=None,
+                notes=None,
+                subtotal_aed=subtotal,
+                vat_aed=(subtotal * Decimal("0.05")).quantize(Decimal("0.01")),
+                total_aed=(subtotal * Decimal("1.05")).quantize(Decimal("0.01")),
+                status=rng.choices(list(STATUSES), weights=list(STATUSES.values()))[0],
+                created_at=datetime.now(),
+                items=items,
+            )
+        )
+    return invoices
+
+
+def serializers() -> dict:
+    import orjson
+    from pydantic import TypeAdapter
+
+    from app.routers.invoices import invoice_to_dict, ndjson_lines
+    from app.schemas import InvoiceItemOut, InvoiceOut, Page
+
+    page_adapter = TypeAdapter(Page[InvoiceOut])
+
+    def model_per_field(invoices: list) -> bytes:
+        # The previous path: InvoiceOut built by hand, re-validated against
+        # response_model, then dumped with stdlib json like JSONResponse.
+        page = {
+            "items": [
+                InvoiceOut(
+                    id=inv.id,
+                    business_id=inv.business_id,
+                    customer_id=inv.customer_id,
+                    number=inv.number,
+                    date=inv.date,
+                    due_date=inv.due_date,
+                    notes=inv.notes,
+                    subtotal_aed=float(inv.subtotal_aed),
+                    vat_aed=float(inv.vat_aed),
+                    total_aed=float(inv.total_aed),
+                    status=inv.status,
+                    items=[
+                        InvoiceItemOut(
+                            id=i.id,
+                            product_id=i.product_id,
+                            description=i.description,
+                            quantity=i.quantity,
+                            unit_price_aed=float(i.unit_price_aed),
+                            line_total_aed=float(i.line_total_aed),
+                        )
+                        for i in inv.items
+                    ],
+                    created_at=inv.created_at,
+                )
+                for inv in invoices
+            ],
+            "next_cursor": None,
+        }
+        content = page_adapter.dump_python(page_adapter.validate_python(page), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def type_adapter(invoices: list) -> bytes:
+        page = page_adapter.validate_python({"items": invoices, "next_cursor": None}, from_attributes=True)
+        return page_adapter.dump_json(page)
+
+    def orjson_dict(invoices: list) -> bytes:
+        return orjson.dumps({"items": [invoice_to_dict(inv) for inv in invoices], "next_cursor": None})
+
+    return {
+        "model_per_field+json": model_per_field,
+        "type_adapter": type_adapter,
+        "dict+orjson": orjson_dict,
+        "ndjson": ndjson_lines,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.serialization", description="Invoice response serialization micro-benchmark"
+    )
+    parser.add_argument("--invoices", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per serializer; the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # Only the models and serializers are used; keep the app off the real database.
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    invoices = build_invoices(args.invoices, args.seed)
+    results = {}
+    for name, serialize in serializers().items():
+        serialize(invoices[:100])
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = serialize(invoices)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {
+            "best_ms": round(best * 1000, 2),
+            "per_invoice_us": round(best / args.invoices * 1e6, 2),
+            "bytes": len(body),
+        }
+        print(f"  {name:22} {results[name]['best_ms']:9.2f} ms  {len(body) / 1e6:6.2f} MB", file=sys.stderr)
+
+    report = {"invoices": args.invoices, "items": sum(len(i.items) for i in invoices), "serializers": results}
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+def hot_product(client, stock: int) -> tuple[int, int]:
+    business_id = client.post("/api/businesses/", json={"name": "Contention"}).json()["id"]
+    product = {"business_id": business_id, "name": "Hot item", "sku": "HOT-1", "price_aed": 5, "stock_qty": stock}
+    return business_id, client.post("/api/products/", json=product).json()["id"]
+
+
+def stock_of(product_id: int) -> int:
+    from app.db import SessionLocal
+    from app.models import Product
+
+    with SessionLocal() as db:
+        return db.get(Product, product_id).stock_qty
+
+
+def checkouts(client, args: argparse.Namespace, reject_oversell: bool) -> dict:
+    # Every till sells the same SKU at once through POST /api/invoices/.
+    from app.core.config import settings
+
+    settings.stock_reject_oversell = reject_oversell
+    business_id, product_id = hot_product(client, args.stock)
+    line = {"product_id": product_id, "description": "Hot item", "quantity": args.quantity, "unit_price_aed": 5}
+
+    def checkout(_) -> int:
+        return client.post("/api/invoices/", json={"business_id": business_id, "items": [line]}).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        statuses = list(pool.map(checkout, range(args.checkouts)))
+    seconds = time.perf_counter() - started
+
+    sold = statuses.count(200)
+    final = stock_of(product_id)
+    expected_sold = min(args.checkouts, args.stock // args.quantity) if reject_oversell else args.checkouts
+    return {
+        "seconds": round(seconds, 3),
+        "checkouts_per_s": round(args.checkouts / seconds, 1),
+        "sold": sold,
+        "rejected": statuses.count(409),
+        "errors": len(statuses) - sold - statuses.count(409),
+        "final_stock": final,
+        # No decrement may be lost, and with rejection on stock never goes below zero.
+        "consistent": final == args.stock - sold * args.quantity
+        and sold == expected_sold
+        and (final >= 0 or not reject_oversell),
+    }
+
+
+def read_modify_write(client, args: argparse.Namespace) -> dict:
+    # The pattern the conditional UPDATE replaces: read stock_qty into Python,
+    # subtract, write it back. Concurrent writers lose updates or fail.
+    from app.db import SessionLocal
+    from app.models import Product
+
+    _, product_id = hot_product(client, args.stock)
+
+    def checkout(_) -> bool:
+        try:
+            with SessionLocal() as db:
+                product = db.get(Product, product_id)
+                product.stock_qty = product.stock_qty - args.quantity
+                db.commit()
+            return True
+        except Exception:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        results = list(pool.map(checkout, range(args.checkouts)))
+    seconds = time.perf_counter() - started
+
+    sold = results.count(True)
+    final = stock_of(product_id)
+    return {
+        "seconds": round(seconds, 3),
+        "checkouts_per_s": round(args.checkouts / seconds, 1),
+        "sold": sold,
+        "errors": results.count(False),
+        "final_stock": final,
+        "lost_updates": sold - (args.stock - final) // args.quantity,
+        "consistent": final == args.stock - sold * args.quantity,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.stock_contention", description="Parallel checkouts of one hot SKU against its stock"
+    )
+    parser.add_argument("--checkouts", type=int, default=1_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--stock", type=int, help="starting stock (default: half of the checkouts, so it runs out)")
+    parser.add_argument("--quantity", type=int, default=1, help="units per checkout")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+    if args.stock is None:
+        args.stock = args.checkouts * args.quantity // 2
+
+    # As in bench.run, the app binds its engine at import, so the environment comes first.
+    workdir = tempfile.mkdtemp(prefix="bench-stock-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["UPLOAD_DIR"] = f"{workdir}/uploads"
+    os.environ["DB_POOL_SIZE"] = str(args.concurrency)
+    # SQLite serializes the writers; a long busy timeout keeps lock waits from
+    # surfacing as errors so the run measures correctness, not starvation.
+    os.environ["SQLITE_BUSY_TIMEOUT_MS"] = "60000"
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    results = {}
+    with TestClient(app) as client:
+        for name, method in {
+            "conditional_update": lambda: checkouts(client, args, reject_oversell=False),
+            "conditional_update_reject": lambda: checkouts(client, args, reject_oversell=True),
+            "read_modify_write": lambda: read_modify_write(client, args),
+        }.items():
+            results[name] = method()
+            print(
+                f"  {name:26} {results[name]['seconds']:8.2f} s  sold {results[name]['sold']:6}"
+                f"  stock {results[name]['final_stock']:6}  consistent {results[name]['consistent']}",
+                file=sys.stderr,
+            )
+
+    report = {
+        "checkouts": args.checkouts,
+        "concurrency": args.concurrency,
+        "stock": args.stock,
+        "quantity": args.quantity,
+        "methods": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output)
+    else:
+        print(output)
+    if not (results["conditional_update"]["consistent"] and results["conditional_update_reject"]["consistent"]):
+        raise SystemExit("stock drifted under concurrent checkouts")
+
+
+if __name__ == "__main__":
+    main()
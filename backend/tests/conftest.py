@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+# Settings and engines are bound when app is imported, so the test database
+# and the query profiler (for query_budget) are configured first.
+_workdir = tempfile.mkdtemp(prefix="pos-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["UPLOAD_DIR"] = f"{_workdir}/uploads"
+os.environ["QUERY_PROFILING"] = "true"
+# Concurrency tests queue many writers on one SQLite file; lock waits must not
+# surface as errors before the assertions run.
+os.environ["SQLITE_BUSY_TIMEOUT_MS"] = "60000"
+os.environ["DB_POOL_SIZE"] = "16"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def business_id(client) -> int:
+    return client.post("/api/businesses/", json={"name": "Test shop"}).json()["id"]
+
+
+@pytest.fixture
+def product_id(client, business_id) -> int:
+    product = {"business_id": business_id, "name": "Cola", "sku": "COLA-330", "price_aed": 2.5, "stock_qty": 100}
+    return client.post("/api/products/", json=product).json()["id"]
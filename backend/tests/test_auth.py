@@ -0,0 +1,28 @@
+import os
+
+from app.core import hashing
+
+
+def die(*_):
+    os._exit(1)
+
+
+def fail(*_):
+    raise ValueError("bcrypt backend error")
+
+
+def register(client, email: str):
+    return client.post("/api/auth/register", json={"email": email, "password": "s3cret"})
+
+
+def test_hashing_failures_are_503_and_the_pool_recovers(client, monkeypatch):
+    monkeypatch.setattr(hashing, "hash_password", die)
+    response = register(client, "dead-worker@example.com")
+    assert (response.status_code, response.headers["retry-after"]) == (503, "1")
+
+    monkeypatch.setattr(hashing, "hash_password", fail)
+    assert register(client, "backend-error@example.com").status_code == 503
+
+    monkeypatch.undo()
+    assert register(client, "recovered@example.com").status_code == 200
+    assert hashing.hashing_pool.stats()["pending"] == 0
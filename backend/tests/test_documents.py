@@ -0,0 +1,27 @@
+import io
+import zipfile
+
+
+NUMBERS = ["../../evil", "evil", 'INV"\r\nX-Injected: 1']
+
+
+def test_document_names_are_sanitized(client, business_id):
+    line = {"description": "Tea", "quantity": 1, "unit_price_aed": 3}
+    ids = [
+        client.post(
+            "/api/invoices/", json={"business_id": business_id, "number": number, "date": "2026-02-01", "items": [line]}
+        ).json()["id"]
+        for number in NUMBERS
+    ]
+
+    pdf = client.get(f"/api/documents/invoices/{ids[2]}.pdf")
+    assert pdf.headers["content-disposition"] == (
+        "inline; filename=\"INV_X-Injected_1.pdf\"; filename*=UTF-8''INV_X-Injected_1.pdf"
+    )
+    assert "x-injected" not in pdf.headers
+
+    archive = client.get(
+        "/api/documents/invoices.zip", params={"business_id": business_id, "start": "2026-02-01", "end": "2026-02-01"}
+    )
+    names = zipfile.ZipFile(io.BytesIO(archive.content)).namelist()
+    assert names == ["evil.pdf", "evil-2.pdf", "INV_X-Injected_1.pdf"]
@@ -0,0 +1,29 @@
+import pytest
+
+from app import db
+from app.core.config import settings
+
+
+def test_ready(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert all(state["ok"] for state in response.json()["databases"].values())
+
+
+@pytest.fixture
+def async_engines(client, monkeypatch):
+    # The DB_ASYNC engines, as db builds them when the setting is on.
+    url = db.async_url(settings.database_url)
+    engines = db.create_async_db_engine(url, 2), db.create_async_db_engine(url, 2, read_only=True)
+    monkeypatch.setattr(db, "async_engine", engines[0])
+    monkeypatch.setattr(db, "async_read_engine", engines[1])
+    yield engines
+    for engine in engines:
+        client.portal.call(engine.dispose)
+
+
+def test_ready_pings_async_engines(client, async_engines):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    databases = response.json()["databases"]
+    assert databases["async"]["ok"] and databases["async_read"]["ok"]
@@ -0,0 +1,30 @@
+def upload(client, business_id: int, kind: str, content: bytes) -> dict:
+    files = {"file": (f"{kind}.csv", content, "text/csv")}
+    response = client.post(f"/api/import/{kind}.csv", params={"business_id": business_id}, files=files)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_product_reimport_keeps_columns_the_file_leaves_out(client, business_id):
+    upload(client, business_id, "products", b"sku,name,price_aed,stock_qty\nA-1,Tea,3.5,40\nA-2,Milk,6,12\n")
+    report = upload(client, business_id, "products", b"sku,name,price_aed\nA-1,Tea,4.25\nA-2,Milk,6.5\n")
+    assert report["updated"] == 2
+
+    products = client.get("/api/products/", params={"business_id": business_id}).json()["items"]
+    assert {p["sku"]: (p["price_aed"], p["stock_qty"]) for p in products} == {"A-1": (4.25, 40), "A-2": (6.5, 12)}
+
+
+def test_customer_reimport_keeps_columns_the_file_leaves_out(client, business_id):
+    upload(client, business_id, "customers", b"name,contact,trn\nAcme,acme@example.com,100200300400003\n")
+    customer = client.get("/api/customers/", params={"business_id": business_id}).json()["items"][0]
+    upload(client, business_id, "customers", f"id,name\n{customer['id']},Acme LLC\n".encode())
+
+    updated = client.get("/api/customers/", params={"business_id": business_id}).json()["items"][0]
+    assert updated == {**customer, "name": "Acme LLC"}
+
+
+def test_invalid_utf8_is_reported_not_a_server_error(client, business_id):
+    report = upload(client, business_id, "products", b"sku,name,price_aed\nB-1,Tea,3\nB-2,Caf\xe9,4\n")
+    assert report["inserted"] == 0
+    assert report["failed"] == 1
+    assert "not UTF-8" in report["errors"][0]["error"]
@@ -0,0 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils import generate_invoice_number
+
+
+CREATES = 300
+TERMINALS = 16
+
+
+def test_parallel_creates_get_unique_consecutive_numbers(client, business_id):
+    other_business = client.post("/api/businesses/", json={"name": "Other shop"}).json()["id"]
+    line = {"description": "Coffee", "quantity": 1, "unit_price_aed": 12}
+
+    def checkout(n: int):
+        # Two businesses interleave so a shared counter would show up as gaps.
+        target = business_id if n % 3 else other_business
+        return target, client.post("/api/invoices/", json={"business_id": target, "items": [line]})
+
+    with ThreadPoolExecutor(TERMINALS) as pool:
+        results = list(pool.map(checkout, range(CREATES)))
+
+    # Every create succeeds first time: no unique-constraint failures to retry.
+    assert [response.status_code for _, response in results] == [200] * CREATES
+    for target in (business_id, other_business):
+        numbers = [response.json()["number"] for owner, response in results if owner == target]
+        assert sorted(numbers) == [generate_invoice_number(target, n) for n in range(1, len(numbers) + 1)]
@@ -0,0 +1,33 @@
+from app.profiling import query_budget
+
+
+def invoice_payload(business_id: int, product_id: int, lines: int) -> dict:
+    items = [
+        {"product_id": product_id, "description": f"Line {n}", "quantity": 1, "unit_price_aed": 2.5}
+        for n in range(lines)
+    ]
+    return {"business_id": business_id, "items": items}
+
+
+def test_create_invoice_statements_do_not_grow_with_lines(client, business_id, product_id):
+    # Sequence, invoice, rollup, two data versions, stock, one executemany for
+    # the lines, then the reload of the invoice and its items.
+    for lines in (1, 25):
+        with query_budget(10, max_repeats=2):
+            response = client.post("/api/invoices/", json=invoice_payload(business_id, product_id, lines))
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == lines
+
+
+def test_list_invoices_statements_do_not_grow_with_page_size(client, business_id, product_id):
+    batch = {"invoices": [invoice_payload(business_id, product_id, 3) for _ in range(30)]}
+    assert client.post("/api/invoices/batch", json=batch).json()["created"] == 30
+
+    totals = []
+    for limit in (1, 30):
+        # Data version for the ETag, the page, and one IN query for its items.
+        with query_budget(3, max_repeats=1) as profiles:
+            response = client.get("/api/invoices/", params={"business_id": business_id, "limit": limit})
+        assert len(response.json()["items"]) == limit
+        totals.append(sum(profile.total for profile in profiles))
+    assert totals[0] == totals[1]
@@ -0,0 +1,75 @@
+import re
+import sqlite3
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import event
+
+from app.db import read_engine
+from app.pagination import encode_cursor
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+INDEXED = re.compile(r"^SEARCH \w+ USING (?:COVERING )?(?:INDEX \w+|INTEGER PRIMARY KEY)")
+
+LISTINGS = [
+    ("/api/invoices/", {}),
+    ("/api/invoices/", {"status": "paid"}),
+    ("/api/invoices/", {"start": "2026-01-01", "end": "2026-12-31"}),
+    ("/api/invoices/", {"customer_id": 1}),
+    ("/api/invoices/", {"status": "paid", "customer_id": 1}),
+    ("/api/invoices/", {"min_total": 10, "max_total": 500}),
+    ("/api/invoices/", {"limit": 1, "after": encode_cursor("2026-01-01", 1)}),
+    ("/api/products/", {}),
+    ("/api/products/", {"q": "cola"}),
+    ("/api/products/search", {"q": "cola"}),
+    ("/api/products/by-sku/COLA-330", {}),
+    ("/api/customers/", {}),
+    ("/api/customers/", {"q": "acme"}),
+    ("/api/customers/search", {"q": "acme"}),
+]
+
+
+@pytest.fixture(scope="module")
+def migrated(tmp_path_factory) -> Path:
+    # Plans are taken against the schema the migrations build, not create_all's.
+    path = tmp_path_factory.mktemp("migrated") / "plans.db"
+    config = Config()
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(config, "head")
+    return path
+
+
+@pytest.fixture
+def listing_queries():
+    seen: list[tuple[str, tuple]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith("SELECT") and "data_versions" not in statement:
+            seen.append((statement, parameters))
+
+    event.listen(read_engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(read_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize("path,params", LISTINGS)
+def test_listing_queries_use_an_index(client, business_id, product_id, migrated, listing_queries, path, params):
+    customer_id = client.post("/api/customers/", json={"business_id": business_id, "name": "Acme"}).json()["id"]
+    line = {"product_id": product_id, "description": "Cola", "quantity": 2, "unit_price_aed": 2.5}
+    invoice = {"business_id": business_id, "customer_id": customer_id, "status": "paid", "items": [line]}
+    assert client.post("/api/invoices/", json=invoice).status_code == 200
+
+    assert client.get(path, params={"business_id": business_id, **params}).status_code == 200
+    assert listing_queries
+
+    with sqlite3.connect(migrated) as conn:
+        for statement, parameters in listing_queries:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            # Every table is reached through an index; only full-text MATCH
+            # scans, and it scans the FTS virtual table by design.
+            steps = [s for s in plan if s.startswith(("SCAN ", "SEARCH ")) and "VIRTUAL TABLE" not in s]
+            assert all(INDEXED.match(step) for step in steps), f"{path} {params}: {plan}\n{statement}"
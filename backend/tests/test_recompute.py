@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import select, update
+
+from app.db import SessionLocal
+from app.models import Invoice, InvoiceItem
+from app.money import invoice_totals
+from app.recompute import recompute_totals
+
+
+INVOICES = [
+    [(2, 3)],
+    [(2, -3)],
+    [(0.1, 1)],
+    [(0.1, -1)],
+    [(0.3, 1)],
+    [(0.3, -1)],
+    [(12.5, 2), (4.99, -1)],
+    [(4.99, 1), (12.5, -2)],
+]
+
+
+def stored_totals(business_id: int) -> dict[int, tuple]:
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Invoice.id, Invoice.subtotal_aed, Invoice.vat_aed, Invoice.total_aed).where(
+                Invoice.business_id == business_id
+            )
+        ).all()
+    return {row.id: tuple(row[1:]) for row in rows}
+
+
+@pytest.fixture
+def invoices(client, business_id) -> dict[int, tuple]:
+    expected = {}
+    for lines in INVOICES:
+        items = [{"description": "Line", "quantity": qty, "unit_price_aed": price} for price, qty in lines]
+        invoice = client.post("/api/invoices/", json={"business_id": business_id, "items": items}).json()
+        expected[invoice["id"]] = invoice_totals(lines).aed()
+    return expected
+
+
+def test_recompute_leaves_api_totals_alone(business_id, invoices):
+    assert stored_totals(business_id) == invoices
+    with SessionLocal() as db:
+        report = recompute_totals(db, business_id, dry_run=True)
+    assert (report.invoices, report.items) == (0, 0)
+
+
+def test_recompute_matches_invoice_totals(business_id, invoices):
+    with SessionLocal() as db:
+        db.execute(update(Invoice).where(Invoice.business_id == business_id).values(vat_aed=0, total_aed=0))
+        db.execute(update(InvoiceItem).where(InvoiceItem.invoice_id.in_(invoices)).values(line_total_aed=0))
+        db.commit()
+        report = recompute_totals(db, business_id)
+    assert report.invoices == len(INVOICES)
+    assert stored_totals(business_id) == invoices
@@ -0,0 +1,26 @@
+import pytest
+
+from app.responses import RangeNotSatisfiable, byte_range
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, None),
+        ("bytes=0-99", (0, 100)),
+        ("bytes=100-", (100, 900)),
+        ("bytes=-100", (900, 100)),
+        ("bytes=900-5000", (900, 100)),
+        ("bytes=500-100", None),
+        ("bytes=0-1,5-9", None),
+        ("items=0-1", None),
+    ],
+)
+def test_byte_range(header, expected):
+    assert byte_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-2000", "bytes=-0"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiable):
+        byte_range(header, 1000)
@@ -0,0 +1,54 @@
+from sqlalchemy import text
+
+from app.db import SessionLocal
+from app.rollups import rebuild_daily_sales
+
+
+def stored_rollup(business_id: int) -> list[tuple]:
+    # Raw column values: on SQLite any float error in the running sums shows up here.
+    with SessionLocal() as db:
+        return db.execute(
+            text("SELECT invoice_count, subtotal_aed, vat_aed, total_aed FROM daily_sales WHERE business_id = :b"),
+            {"b": business_id},
+        ).all()
+
+
+def test_daily_sales_sums_stay_in_whole_fils(client, business_id):
+    line = {"description": "Sweet", "quantity": 1, "unit_price_aed": 0.1}
+    created = [
+        client.post("/api/invoices/", json={"business_id": business_id, "date": "2026-01-15", "items": [line]}).json()
+        for _ in range(30)
+    ]
+    client.patch(f"/api/invoices/{created[0]['id']}", json={"items": [dict(line, quantity=2)]})
+    client.delete(f"/api/invoices/{created[1]['id']}")
+
+    # 28 invoices of 0.10 + 0.01 VAT, one of 0.20 + 0.01 VAT.
+    assert stored_rollup(business_id) == [(29, 3.0, 0.29, 3.29)]
+    report = client.get(
+        "/api/reports/sales",
+        params={"business_id": business_id, "start": "2026-01-01", "end": "2026-01-31", "granularity": "month"},
+    ).json()
+    assert report == [{"period": "2026-01-01", "invoice_count": 29, "subtotal_aed": 3.0, "vat_aed": 0.29, "total_aed": 3.29}]
+
+    with SessionLocal() as db:
+        rebuild_daily_sales(db, business_id)
+        db.commit()
+    assert stored_rollup(business_id) == [(29, 3.0, 0.29, 3.29)]
+
+
+def test_vat_return_sums_invoice_totals_in_fils(client, business_id):
+    line = {"description": "Sweet", "quantity": 1, "unit_price_aed": 0.1}
+    invoice = {"business_id": business_id, "date": "2026-01-15", "items": [line]}
+    ids = [client.post("/api/invoices/", json=invoice).json()["id"] for _ in range(3)]
+    # Amounts written before totals were kept in whole fils count as their rounded fils.
+    with SessionLocal() as db:
+        db.execute(
+            text("UPDATE invoices SET vat_aed = 0.005, total_aed = 0.105 WHERE id IN (:a, :b)"),
+            {"a": ids[0], "b": ids[1]},
+        )
+        db.commit()
+
+    report = client.get(
+        "/api/reports/vat-return", params={"business_id": business_id, "start": "2026-01-01", "end": "2026-01-31"}
+    ).json()
+    assert (report["taxable_supplies_aed"], report["output_vat_aed"], report["total_aed"]) == (0.3, 0.03, 0.33)
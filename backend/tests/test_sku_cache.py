@@ -0,0 +1,15 @@
+from app.cache import sku_cache
+
+
+def test_stale_entry_is_not_served_after_a_write(client, business_id, product_id):
+    lookup = {"business_id": business_id}
+    assert client.get("/api/products/by-sku/COLA-330", params=lookup).json()["stock_qty"] == 100
+
+    # A read that raced the sale below stores what it saw after the sale's
+    # invalidation has already run.
+    stale = sku_cache.get((business_id, "COLA-330"))
+    line = {"product_id": product_id, "description": "Cola", "quantity": 3, "unit_price_aed": 2.5}
+    assert client.post("/api/invoices/", json={"business_id": business_id, "items": [line]}).status_code == 200
+    sku_cache.set((business_id, "COLA-330"), stale)
+
+    assert client.get("/api/products/by-sku/COLA-330", params=lookup).json()["stock_qty"] == 97
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.config import settings
+
+
+STOCK = 100  # the product_id fixture
+CHECKOUTS = 160
+TILLS = 16
+
+
+def stock(client, business_id: int) -> int:
+    return client.get("/api/products/by-sku/COLA-330", params={"business_id": business_id}).json()["stock_qty"]
+
+
+def line(product_id: int, quantity: int) -> dict:
+    return {"product_id": product_id, "description": "Cola", "quantity": quantity, "unit_price_aed": 2}
+
+
+def test_batch_moves_stock_like_single_creates(client, business_id, product_id):
+    # A return line (negative quantity) and a sale that cancels it out must
+    # move stock the same whether posted one by one or as a batch.
+    invoices = [
+        {"business_id": business_id, "items": [line(product_id, -3)]},
+        {"business_id": business_id, "items": [line(product_id, 1)]},
+        {"business_id": business_id, "items": [line(product_id, 2), line(product_id, -2)]},
+    ]
+    start = stock(client, business_id)
+    for invoice in invoices:
+        assert client.post("/api/invoices/", json=invoice).status_code == 200
+    single = stock(client, business_id)
+    assert single == start + 2
+
+    assert client.post("/api/invoices/batch", json={"invoices": invoices}).json()["created"] == 3
+    assert stock(client, business_id) == single + 2
+
+
+def test_batch_reports_oversold_invoices_and_keeps_the_rest(client, business_id, product_id, monkeypatch):
+    monkeypatch.setattr(settings, "stock_reject_oversell", True)
+    invoices = [{"business_id": business_id, "items": [line(product_id, qty)]} for qty in (60, 50, 40)]
+    out = client.post("/api/invoices/batch", json={"invoices": invoices}).json()
+    assert (out["created"], out["failed"]) == (2, 1)
+    assert [result["ok"] for result in out["results"]] == [True, False, True]
+    assert out["results"][1]["error"] == f"Insufficient stock (product {product_id}: 50 requested, 40 in stock)"
+    assert stock(client, business_id) == 0
+
+
+@pytest.mark.parametrize("reject_oversell", [True, False])
+def test_parallel_checkouts_of_one_sku(client, business_id, product_id, monkeypatch, reject_oversell):
+    monkeypatch.setattr(settings, "stock_reject_oversell", reject_oversell)
+
+    def checkout(_):
+        invoice = {"business_id": business_id, "items": [line(product_id, 1)]}
+        return client.post("/api/invoices/", json=invoice).status_code
+
+    with ThreadPoolExecutor(TILLS) as pool:
+        statuses = list(pool.map(checkout, range(CHECKOUTS)))
+
+    sold = statuses.count(200)
+    # No decrement is lost, and with rejection on the SKU sells out exactly.
+    assert stock(client, business_id) == STOCK - sold
+    if reject_oversell:
+        assert (sold, statuses.count(409)) == (STOCK, CHECKOUTS - STOCK)
+    else:
+        assert sold == CHECKOUTS